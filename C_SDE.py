@@ -1,17 +1,160 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, messagebox, filedialog, simpledialog
 import re
+import io
 import json
 import datetime
+import gzip
+import hashlib
+import importlib.util
+import os
+import zipfile
+from bisect import bisect_left, bisect_right
 import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from typing import List, Dict, Any, Tuple, Set
 from collections import defaultdict
+
+# Check the required third-party libraries once, before importing them
+MISSING_LIBRARIES = [name for name in ('networkx', 'matplotlib') if importlib.util.find_spec(name) is None]
+if MISSING_LIBRARIES and __name__ == "__main__":
+    print("Missing required libraries. Please install:")
+    print("pip install networkx matplotlib")
+    sys.exit(1)
+
 import networkx as nx
-import matplotlib.pyplot as plt
+import numpy as np
+import matplotlib
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-from matplotlib.patches import FancyBboxPatch
+from matplotlib.figure import Figure
+from matplotlib.patches import FancyBboxPatch, FancyArrowPatch, BoxStyle
+from matplotlib.collections import PatchCollection
 from matplotlib.lines import Line2D
 
+try:
+    import orjson  # optional, much faster JSON export
+except ImportError:
+    orjson = None
+
+# TTA graph node appearance, shared by the embedded and the saved graph
+TTA_BOX_STYLE = BoxStyle("round", pad=0.1)
+TTA_NODE_COLORS = {
+    'START': ('lightgreen', 'darkgreen'),
+    'END': ('lightcoral', 'darkred'),
+    'XOR': ('lightyellow', 'orange'),
+    'LOOP': ('lightblue', 'darkblue'),
+}
+TTA_DEFAULT_NODE_COLORS = ('lightgray', 'gray')  # ACTIVITY, BLOCK
+
+# TTA layout spacing (x_center, x_branch_offset, y_spacing), growing with the block count:
+# up to 15 blocks, up to 30 blocks, more
+TTA_LAYOUT_SPACING_LIMITS = (15, 30)
+TTA_LAYOUT_SPACING = ((6, 4, 2.5), (8, 5, 3.5), (10, 6, 4.5))
+
+# Saved vector dependency graphs (PDF) with more nodes + edges than this draw them as an
+# embedded image; title and labels stay vector text
+GRAPH_RASTERIZE_THRESHOLD = 5000
+RASTER_IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Largest image a saved graph is rendered to (64 Mpx is a 256 MB RGBA buffer); graphs whose
+# figure grows with their size get a lower dpi instead
+MAX_SAVED_GRAPH_PIXELS = 64_000_000
+
+# Spring layouts of dependency graphs with at least LAYOUT_DISK_CACHE_MIN_NODES nodes are also kept
+# on disk, so reopening the same program skips the layout (smaller ones compute faster than a file
+# read). Only the most recently used files are kept; C_SDE_LAYOUT_CACHE=0 turns the cache off
+LAYOUT_CACHE_DIR = Path.home() / '.cache' / 'c_sde'
+LAYOUT_DISK_CACHE_ENABLED = os.environ.get('C_SDE_LAYOUT_CACHE', '1') != '0'
+LAYOUT_DISK_CACHE_MIN_NODES = 100
+LAYOUT_DISK_CACHE_MAX_FILES = 64
+
+
+def graph_save_options(filename, fast=False, figsize=None):
+    """Return savefig arguments for a saved graph; fast export trades resolution and file size for speed
+    
+    With the figure size in inches, raster formats get their dpi lowered so the
+    image stays within MAX_SAVED_GRAPH_PIXELS.
+    """
+    options = {'dpi': 150 if fast else 300}
+    if figsize is not None and filename.lower().endswith(RASTER_IMAGE_EXTENSIONS):
+        width, height = figsize
+        options['dpi'] = min(options['dpi'], int((MAX_SAVED_GRAPH_PIXELS / (width * height)) ** 0.5))
+    if fast and filename.lower().endswith('.png'):
+        options['pil_kwargs'] = {'compress_level': 1}  # zlib level 1 instead of libpng's default 6
+    return options
+
+
+def tta_layout_spacing(num_blocks):
+    """Return (x_center, x_branch_offset, y_spacing) of a TTA layout with num_blocks blocks"""
+    return TTA_LAYOUT_SPACING[bisect_left(TTA_LAYOUT_SPACING_LIMITS, num_blocks)]
+
+
+def layout_cache_path(nodes, edges):
+    """Return the on-disk cache file of the layout of a graph with these nodes and edges"""
+    key = hashlib.blake2b(repr((sorted(nodes), sorted(edges))).encode('utf-8'), digest_size=16).hexdigest()
+    return LAYOUT_CACHE_DIR / f"layout_{key}.npz"
+
+
+def load_cached_layout(path):
+    """Return the {node: position} layout stored at path, or None if it is missing or unreadable"""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            pos = dict(zip(data['nodes'].tolist(), data['pos']))
+    except (OSError, ValueError, KeyError, zipfile.BadZipFile):
+        return None
+    try:
+        os.utime(path)  # Mark as recently used, so pruning keeps it
+    except OSError:
+        pass
+    return pos
+
+
+def store_cached_layout(path, pos):
+    """Store a {node: position} layout at path; the cache is best effort, so failures are ignored
+    
+    Only the LAYOUT_DISK_CACHE_MAX_FILES most recently used layouts are kept.
+    """
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(path, nodes=np.array(list(pos)), pos=np.array(list(pos.values())))
+        cached = sorted(path.parent.glob('layout_*.npz'), key=lambda f: f.stat().st_mtime, reverse=True)
+        for stale in cached[LAYOUT_DISK_CACHE_MAX_FILES:]:
+            stale.unlink()
+    except OSError:
+        pass
+
+
+def rasterize_graph_data(filename, num_elements):
+    """Return True if a graph saved to filename should rasterize its nodes and edges"""
+    return num_elements > GRAPH_RASTERIZE_THRESHOLD and not filename.lower().endswith(RASTER_IMAGE_EXTENSIONS)
+
+
+def dumps_json(data, indent=2):
+    """Serialize export data as UTF-8 JSON bytes, using orjson when it is installed
+    
+    indent is 2 or None; None gives compact single-line output.
+    """
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if indent is not None:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, option=option)
+    if indent is None:
+        return json.dumps(data, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return json.dumps(data, indent=indent, ensure_ascii=False).encode('utf-8')
+
+
+def write_json_file(filename, data, compact=False, compress=False):
+    """Write export data to filename as indented JSON, or single-line and/or gzipped"""
+    # Serialize first and write in one call - json.dump writes token by token
+    payload = dumps_json(data, indent=None if compact else 2)
+    if compress:
+        payload = gzip.compress(payload, compresslevel=1)  # near write speed, still shrinks JSON several times
+    with open(filename, 'wb') as f:
+        f.write(payload)
+
+
 class CSyntaxDirectedEnvironment:
     def __init__(self):
         self.root = tk.Tk()
@@ -25,6 +168,29 @@ class CSyntaxDirectedEnvironment:
         self.dataflow_analyzer = None
         self.tta_analyzer = None  # NEW: TTA Graph analyzer
         self.current_canvas = None  # For matplotlib cleanup
+        self._graph_canvases = {}  # {canvas frame: (Figure, FigureCanvasTkAgg)} reused across regenerations
+        self._graph_drawn = {}  # {canvas frame: key of the graph it currently shows}
+        self._tta_display = None  # (blocks, pos, (box_w, box_h)) of the TTA graph on screen
+        self._tta_click_cid = None  # Double-click handler id on the TTA graph canvas
+        self._expanded_blocks = set()  # Start lines of TTA blocks the user expanded in a contracted graph
+        self._large_graph_answer = None  # (structure_key, bool) - whether to draw a TTA graph that stays large
+        self._layout_cache = {}  # {(frozenset(nodes), frozenset(edges)): {node: (x, y)}}
+        self._tta_layout_cache = None  # (structure_key, {block_idx: (x, y)}) of the last uncontracted TTA layout
+        self._dependency_graph = None  # DiGraph built from the current dataflow analysis
+        
+        # Incremental analysis state
+        self._analyzed_lines = None  # Buffer lines the current analysis was built from
+        self._highlighted = bytearray()  # 1 at [line_num] once that line has its syntax and def/use tags
+        self._viewport_job = None  # Pending highlighting of lines scrolled into view
+        self._dirty_lines = set()  # Lines touched since the last analysis
+        self._last_code_hash = None  # Hash of the buffer the current analysis was built from
+        self._analysis_pending = False  # An analysis was skipped while the window was hidden
+        self._line_number_count = None  # Number of lines currently shown in the line number gutter
+        self._analysis_cache = None  # (code_hash, dataflow_analyzer, tta_analyzer) of the analysis before that
+        self._background_analysis = None  # Pending worker analysis of a loaded file
+        self._analysis_pool = ThreadPoolExecutor(max_workers=1)  # Analyzes loaded files off the Tk thread
+        self._export_pool = ThreadPoolExecutor(max_workers=1)  # Serializes and writes exports off the Tk thread
+        self._var_tree_index = {}  # {var_name: {'iid': str, 'definitions': (group_iid, rows), 'uses': (group_iid, rows)}}
         
         # C language constructs - define these BEFORE setup_ui()
         self.c_keywords = {
@@ -35,6 +201,32 @@ class CSyntaxDirectedEnvironment:
             'unsigned', 'void', 'volatile', 'while', '_Bool', '_Complex', '_Imaginary'
         }
         
+        # Precompiled highlighting lexer - one pass per line, the group name is the tag.
+        # Alternatives are tried in order, so keywords and numbers inside strings or
+        # comments stay part of the string/comment.
+        self._token_re = re.compile('|'.join((
+            r'(?P<comment>//.*)',
+            r'(?P<string>"(?:[^"\\]|\\.)*"|\'(?:[^\'\\]|\\.)\')',
+            r'(?P<keyword>\b(?:' + '|'.join(map(re.escape, sorted(self.c_keywords))) + r')\b)',
+            r'(?P<number>\b\d+\.?\d*[fFlL]?\b)',
+            r'(?P<function>\b[a-zA-Z_][a-zA-Z0-9_]*(?=\s*\())',
+        )))
+        
+        # Syntax-check scanner - one pass over the whole buffer. Comments, literals and
+        # preprocessor lines are consumed whole, so only brackets in code are counted.
+        self._scan_re = re.compile('|'.join((
+            r'(?P<comment>//[^\n]*|/\*.*?(?:\*/|\Z))',
+            r'(?P<preprocessor>^[ \t]*#[^\n]*)',
+            r'(?P<string>"(?:[^"\\\n]|\\.)*(?P<closed>")?)',
+            r'(?P<char>\'(?:[^\'\\\n]|\\.)*\'?)',
+            r'(?P<bracket>[{}()\[\]])',
+        )), re.MULTILINE | re.DOTALL)
+        
+        # Every tag cleared before a re-highlight
+        self._highlight_tags = ('keyword', 'string', 'comment', 'function', 'type', 'number',
+                                'preprocessor', 'operator', 'error', 'definition', 'use',
+                                'block_start', 'block_end')
+        
         self.c_operators = {
             # Arithmetic
             '+', '-', '*', '/', '%', '++', '--',
@@ -68,6 +260,9 @@ class CSyntaxDirectedEnvironment:
         # Set up proper closing protocol
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
         
+        # Run analyses skipped while the window was minimized once it is shown again
+        self.root.bind('<Map>', self._on_map)
+        
         # Now setup UI after all attributes are defined
         self.setup_ui()
         
@@ -124,9 +319,8 @@ class CSyntaxDirectedEnvironment:
         self.line_numbers.config(yscrollcommand=self._on_line_scroll)
         
         # Bind events for real-time analysis
-        self.text_editor.bind('<KeyRelease>', self.on_text_change)
-        self.text_editor.bind('<Button-1>', self.on_text_change)
-        self.text_editor.bind('<KeyPress>', self.on_text_change)
+        # Only actual edits schedule an analysis - clicks and cursor keys don't change the text
+        self.text_editor.bind('<<Modified>>', self._on_modified)
         self.text_editor.bind('<MouseWheel>', self._on_mousewheel)
         self.text_editor.bind('<Button-4>', self._on_mousewheel)
         self.text_editor.bind('<Button-5>', self._on_mousewheel)
@@ -188,10 +382,12 @@ class CSyntaxDirectedEnvironment:
         ttk.Label(self.graph_frame, text="Visual Dependency Graph", font=('Arial', 10, 'bold')).pack(anchor=tk.W)
         
         # Graph controls
+        self.fast_export = tk.BooleanVar(value=False)  # Save graphs at lower resolution and compression
         graph_controls = ttk.Frame(self.graph_frame)
         graph_controls.pack(fill=tk.X, pady=(5, 0))
         ttk.Button(graph_controls, text="Generate Graph", command=self.generate_dependency_graph).pack(side=tk.LEFT)
         ttk.Button(graph_controls, text="Save Graph", command=self.save_dependency_graph).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Checkbutton(graph_controls, text="Fast export", variable=self.fast_export).pack(side=tk.LEFT, padx=(10, 0))
         
         # Graph canvas frame
         self.graph_canvas_frame = ttk.Frame(self.graph_frame)
@@ -208,6 +404,7 @@ class CSyntaxDirectedEnvironment:
         tta_graph_controls.pack(fill=tk.X, pady=(5, 0))
         ttk.Button(tta_graph_controls, text="Generate TTA Graph", command=self.generate_tta_graph).pack(side=tk.LEFT)
         ttk.Button(tta_graph_controls, text="Save TTA Graph", command=self.save_tta_graph).pack(side=tk.LEFT, padx=(5, 0))
+        ttk.Checkbutton(tta_graph_controls, text="Fast export", variable=self.fast_export).pack(side=tk.LEFT, padx=(10, 0))
         
         # TTA Graph canvas frame with constrained size
         self.tta_graph_canvas_frame = ttk.Frame(self.tta_graph_frame)
@@ -241,6 +438,16 @@ class CSyntaxDirectedEnvironment:
         )
         self.error_text.pack(fill=tk.BOTH, expand=True, pady=(5, 0))
         
+        # Text/tree tabs are only rebuilt while visible - the rest wait until selected
+        self._lazy_tabs = {
+            'var': (self.var_frame, self.update_variable_tracking),
+            'deps': (self.deps_frame, self.update_dependencies_display),
+            'tta': (self.tta_frame, self.update_tta_blocks_display),
+            'll': (self.linked_list_frame, self.update_linked_list_display),
+        }
+        self._tab_dirty = dict.fromkeys(self._lazy_tabs, True)
+        self.notebook.bind('<<NotebookTabChanged>>', self._refresh_current_tab)
+        
         # Bottom status bar - pack FIRST to ensure it's at the very bottom
         self.status_bar = ttk.Label(main_frame, text="Ready", relief=tk.SUNKEN)
         self.status_bar.pack(side=tk.BOTTOM, fill=tk.X, pady=(2, 0))
@@ -270,6 +477,12 @@ class CSyntaxDirectedEnvironment:
             command=self.export_tta_analysis
         ).pack(side=tk.LEFT, padx=(10, 0))
         
+        # Export options for large analyses
+        self.compact_export = tk.BooleanVar(value=False)  # Single-line JSON, linked list without the C text
+        self.gzip_export = tk.BooleanVar(value=False)  # Gzip exports and add .gz to the filename
+        ttk.Checkbutton(controls_frame, text="Compact JSON", variable=self.compact_export).pack(side=tk.LEFT, padx=(10, 0))
+        ttk.Checkbutton(controls_frame, text="Gzip", variable=self.gzip_export).pack(side=tk.LEFT, padx=(5, 0))
+        
         # Load file button
         ttk.Button(
             controls_frame, 
@@ -288,7 +501,7 @@ class CSyntaxDirectedEnvironment:
         ttk.Button(
             controls_frame, 
             text="Refresh Analysis", 
-            command=self.analyze_code
+            command=lambda: self.analyze_code(force=True)
         ).pack(side=tk.LEFT, padx=(10, 0))
         
         # Configure syntax highlighting tags
@@ -338,6 +551,9 @@ int main() {
     def _on_text_scroll(self, *args):
         """Synchronize line numbers with text editor scrolling"""
         self.line_numbers.yview_moveto(args[0])
+        # Highlight whatever scrolled into view once Tk is idle
+        if self._viewport_job is None and self._analyzed_lines is not None:
+            self._viewport_job = self.root.after_idle(self._highlight_visible_lines)
         return 'break'
     
     def _on_line_scroll(self, *args):
@@ -362,10 +578,14 @@ int main() {
     
     def update_line_numbers(self):
         """Update line numbers based on text content"""
+        line_count = int(self.text_editor.index('end-1c').split('.')[0])
+        if line_count == self._line_number_count:
+            return  # Gutter is already up to date
+        self._line_number_count = line_count
+        
         self.line_numbers.config(state='normal')
         self.line_numbers.delete('1.0', tk.END)
         
-        line_count = self.text_editor.get('1.0', tk.END).count('\n')
         line_numbers = '\n'.join(str(i) for i in range(1, line_count + 1))
         self.line_numbers.insert('1.0', line_numbers)
         
@@ -396,325 +616,475 @@ int main() {
         # Cancel any pending analysis
         if hasattr(self, '_analysis_job'):
             self.root.after_cancel(self._analysis_job)
-        # Schedule new analysis
-        self._analysis_job = self.root.after(1000, self.analyze_code)  # Debounce analysis
+        # Schedule new analysis - debounce scales with file size (~2ms per line, 100ms to 1.5s)
+        line_count = int(self.text_editor.index('end-1c').split('.')[0])
+        delay = max(100, min(1500, line_count * 2))
+        self._analysis_job = self.root.after(delay, self.analyze_code)  # Debounce analysis
     
-    def analyze_code(self):
-        """Main analysis function with dataflow and TTA analysis"""
+    def _on_modified(self, event=None):
+        """Record the line being edited and schedule an analysis"""
+        if not self.text_editor.edit_modified():
+            return
+        # Reset the flag so <<Modified>> fires again on the next edit
+        self.text_editor.edit_modified(False)
+        if self._background_analysis is not None:
+            # Tk queues <<Modified>>, so loading a file gets here after the worker was started;
+            # scheduling analyze_code would redo its work on the Tk thread
+            return
+        self._dirty_lines.add(int(self.text_editor.index('insert linestart').split('.')[0]))
+        self.on_text_change()
+    
+    def _on_map(self, event):
+        """Run the analysis that was deferred while the window was hidden"""
+        if event.widget is self.root and self._analysis_pending:
+            self._analysis_pending = False
+            self.analyze_code()
+    
+    def _analyze_in_background(self):
+        """Build the analyzers for the current buffer on a worker thread
+        
+        Only the dataflow and TTA analysis runs off the Tk thread. The finished analyzers
+        are handed to analyze_code through the analysis cache, which updates the widgets.
+        Until then edits do not schedule analyses of their own; analyze_code redoes the
+        analysis afterwards if the buffer changed in the meantime.
+        """
+        # The worker replaces the debounced analysis scheduled by the edit
+        if hasattr(self, '_analysis_job'):
+            self.root.after_cancel(self._analysis_job)
+        
         code = self.text_editor.get('1.0', tk.END)
+        future = self._analysis_pool.submit(self._build_analyzers, code)
+        self._background_analysis = future
+        self.root.after(50, self._poll_background_analysis, future)
+    
+    @staticmethod
+    def _build_analyzers(code):
+        """Return (code_hash, dataflow_analyzer, tta_analyzer) for code - runs on the worker thread"""
+        lines = code.splitlines()
+        dataflow_analyzer = DataflowAnalyzer(code, lines)
+        dataflow_analyzer.analyze()
+        tta_analyzer = TTAGraphAnalyzer(code, dataflow_analyzer, lines)
+        tta_analyzer.analyze()
+        return hash(code), dataflow_analyzer, tta_analyzer
+    
+    def _poll_background_analysis(self, future):
+        """Apply the worker's analysis once it is done"""
+        if not future.done():
+            self.root.after(50, self._poll_background_analysis, future)
+            return
         
-        # Clear previous highlighting
-        for tag in ['keyword', 'string', 'comment', 'function', 'type', 'number', 
-                   'preprocessor', 'operator', 'error', 'definition', 'use', 'block_start', 'block_end']:
-            self.text_editor.tag_remove(tag, '1.0', tk.END)
+        if self._background_analysis is future:
+            self._background_analysis = None  # Edits schedule analyses again
+        try:
+            self._analysis_cache = future.result()
+        except Exception as e:
+            print(f"Background analysis error: {e}")
+        # Reuses the cached analyzers unless the buffer was edited in the meantime
+        self.analyze_code()
+    
+    def _get_dirty_range(self, lines):
+        """Return (first_line, last_line) if only that range changed since the last analysis, else None"""
+        if not self.dataflow_analyzer or self._analyzed_lines is None or not self._dirty_lines:
+            return None
         
-        # Perform syntax highlighting
-        self.highlight_syntax(code)
+        old_lines = self._analyzed_lines
+        if len(lines) != len(old_lines):
+            return None  # Lines were inserted or removed - every line number shifts
         
-        # Perform comprehensive dataflow analysis
-        self.dataflow_analyzer = DataflowAnalyzer(code)
-        self.dataflow_analyzer.analyze()
+        first_line = min(self._dirty_lines)
+        last_line = min(max(self._dirty_lines), len(lines))
+        if first_line > last_line or last_line - first_line >= 50:
+            return None
         
-        # NEW: Perform TTA block analysis
-        self.tta_analyzer = TTAGraphAnalyzer(code, self.dataflow_analyzer)
-        self.tta_analyzer.analyze()
+        # The dirty set is only a hint - make sure nothing outside it changed
+        if old_lines[:first_line - 1] != lines[:first_line - 1] or old_lines[last_line:] != lines[last_line:]:
+            return None
         
-        # Update all analysis displays
-        self.update_variable_tracking()
-        self.update_dependencies_display()
-        self.update_linked_list_display()
-        self.update_tta_blocks_display()  # NEW
-        self.highlight_definitions_and_uses()
+        return first_line, last_line
+    
+    def analyze_code(self, force=False):
+        """Main analysis function with dataflow and TTA analysis
+        
+        Does nothing if the buffer was not edited since the last analysis, unless force is set.
+        While the window is hidden the analysis is deferred until it is mapped again.
+        """
+        if not self.root.winfo_viewable():
+            self._analysis_pending = True
+            return
+        
+        code = self.text_editor.get('1.0', tk.END)
+        code_hash = hash(code)
+        if code_hash == self._last_code_hash and not self._dirty_lines and not force:
+            return  # e.g. cursor movement - nothing to redo
+        
+        lines = code.splitlines()
+        dirty_range = None if force else self._get_dirty_range(lines)
+        previous_tta = self.tta_analyzer
+        
+        # Undoing back to the previous buffer reuses the previous analyzers
+        cached = self._analysis_cache
+        cache_hit = cached is not None and cached[0] == code_hash
+        if cache_hit:
+            dirty_range = None
+        if dirty_range:
+            # The dataflow analyzer is updated in place below, so it can't be cached
+            self._analysis_cache = None
+        elif code_hash != self._last_code_hash:
+            self._analysis_cache = (self._last_code_hash, self.dataflow_analyzer, self.tta_analyzer)
+        self._last_code_hash = code_hash
+        
+        if dirty_range:
+            # Only a few lines changed: re-lex and re-analyze just those
+            first_line, last_line = dirty_range
+            for tag in self._highlight_tags:
+                if tag not in ('block_start', 'block_end'):
+                    self.text_editor.tag_remove(tag, f"{first_line}.0", f"{last_line}.end")
+            self.highlight_syntax(lines, first_line, last_line)
+            self.dataflow_analyzer.reanalyze_lines(code, range(first_line, last_line + 1), lines)
+        else:
+            first_line, last_line = 1, None
+            
+            # Clear previous highlighting; lines are highlighted again as they become visible
+            for tag in self._highlight_tags:
+                self.text_editor.tag_remove(tag, '1.0', tk.END)
+            self._highlighted = bytearray(len(lines) + 1)
+            
+            # Perform comprehensive dataflow analysis
+            if cache_hit:
+                self.dataflow_analyzer = cached[1]
+            else:
+                self.dataflow_analyzer = DataflowAnalyzer(code, lines)
+                self.dataflow_analyzer.analyze()
+        
+        # NEW: Perform TTA block analysis (arcs are reused when the block structure is unchanged)
+        if cache_hit:
+            self.tta_analyzer = cached[2]
+        else:
+            self.tta_analyzer = TTAGraphAnalyzer(code, self.dataflow_analyzer, lines)
+            self.tta_analyzer.analyze(previous_tta if dirty_range else None)
+        
+        # Update the visible analysis display; the others are updated when selected
+        self._dependency_graph = None
+        self._tab_dirty = dict.fromkeys(self._tab_dirty, True)
+        self._refresh_current_tab()
+        if dirty_range:
+            self.highlight_definitions_and_uses(lines, first_line, last_line)
+            self._highlighted[first_line:last_line + 1] = b'\x01' * (last_line - first_line + 1)
+            for tag in ('block_start', 'block_end'):
+                self.text_editor.tag_remove(tag, '1.0', tk.END)
         self.highlight_block_boundaries()  # NEW
         
+        self._analyzed_lines = lines
+        self._dirty_lines.clear()
+        self._highlight_visible_lines()
+        
         # Check for syntax errors
-        self.check_syntax_errors(code)
+        self.check_syntax_errors(lines)
         
         # Update status
-        line_count = len(code.splitlines())
+        line_count = len(lines)
         char_count = len(code)
         var_count = len(self.dataflow_analyzer.variables) if self.dataflow_analyzer else 0
         deps_count = len(self.dataflow_analyzer.dependencies) if self.dataflow_analyzer else 0
         block_count = len(self.tta_analyzer.blocks) if self.tta_analyzer else 0
         self.status_bar.config(text=f"Lines: {line_count} | Variables: {var_count} | Dependencies: {deps_count} | Blocks: {block_count}")
     
-    def highlight_syntax(self, code):
-        """Syntax highlighting for C code"""
-        lines = code.splitlines()
-        
-        for i, line in enumerate(lines):
+    def _highlight_visible_lines(self):
+        """Apply syntax and definition/use tags to the visible lines that don't have them yet"""
+        self._viewport_job = None
+        lines = self._analyzed_lines
+        if lines is None or self._dirty_lines:
+            return  # The buffer was edited - wait for the analysis to catch up
+        
+        # Visible lines plus a margin, so short scrolls don't show untagged text
+        margin = 50
+        first_line = int(self.text_editor.index('@0,0').split('.')[0]) - margin
+        last_line = int(self.text_editor.index(f"@0,{self.text_editor.winfo_height()}").split('.')[0]) + margin
+        first_line = max(1, first_line)
+        last_line = min(len(lines), last_line)
+        
+        # Tag each run of not yet highlighted lines in one go
+        highlighted = self._highlighted
+        start = highlighted.find(0, first_line, last_line + 1)
+        while start != -1:
+            end = highlighted.find(1, start, last_line + 1)
+            if end == -1:
+                end = last_line + 1
+            highlighted[start:end] = b'\x01' * (end - start)
+            self.highlight_syntax(lines, start, end - 1)
+            self.highlight_definitions_and_uses(lines, start, end - 1)
+            start = highlighted.find(0, end, last_line + 1)
+    
+    def highlight_syntax(self, lines, first_line=1, last_line=None):
+        """Syntax highlighting for C code, optionally limited to a range of lines"""
+        lines = lines[first_line - 1:last_line]
+        # Collect index pairs per tag so each tag is applied with a single Tk call
+        ranges = defaultdict(list)
+        index = "{}.{}".format  # Tk "line.column" index
+        
+        for line_num, line in enumerate(lines, first_line):
             # Highlight preprocessor directives
             if line.strip().startswith('#'):
-                start = f"{i+1}.0"
-                end = f"{i+1}.end"
-                self.text_editor.tag_add('preprocessor', start, end)
+                start = index(line_num, 0)
+                end = index(line_num, 'end')
+                ranges['preprocessor'].extend((start, end))
                 continue
             
-            # Highlight keywords
-            for keyword in self.c_keywords:
-                pattern = r'\b' + re.escape(keyword) + r'\b'
-                for match in re.finditer(pattern, line):
-                    start = f"{i+1}.{match.start()}"
-                    end = f"{i+1}.{match.end()}"
-                    self.text_editor.tag_add('keyword', start, end)
-            
-            # Highlight strings
-            for match in re.finditer(r'"([^"\\]|\\.)*"', line):
-                start = f"{i+1}.{match.start()}"
-                end = f"{i+1}.{match.end()}"
-                self.text_editor.tag_add('string', start, end)
-            
-            # Highlight character literals
-            for match in re.finditer(r"'([^'\\]|\\.)'", line):
-                start = f"{i+1}.{match.start()}"
-                end = f"{i+1}.{match.end()}"
-                self.text_editor.tag_add('string', start, end)
-            
-            # Highlight comments
-            comment_pos = line.find('//')
-            if comment_pos != -1:
-                start = f"{i+1}.{comment_pos}"
-                end = f"{i+1}.end"
-                self.text_editor.tag_add('comment', start, end)
-            
-            # Highlight numbers
-            for match in re.finditer(r'\b\d+\.?\d*[fFlL]?\b', line):
-                start = f"{i+1}.{match.start()}"
-                end = f"{i+1}.{match.end()}"
-                self.text_editor.tag_add('number', start, end)
-            
-            # Highlight function calls
-            for match in re.finditer(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*\(', line):
-                start = f"{i+1}.{match.start()}"
-                end = f"{i+1}.{match.start() + len(match.group(1))}"
-                self.text_editor.tag_add('function', start, end)
+            # Highlight comments, strings, character literals, keywords, numbers and function calls
+            for match in self._token_re.finditer(line):
+                start = index(line_num, match.start())
+                end = index(line_num, match.end())
+                ranges[match.lastgroup].extend((start, end))
+        
+        for tag, indices in ranges.items():
+            self.text_editor.tag_add(tag, *indices)
+    
+    def _replace_text(self, widget, text):
+        """Replace the contents of a text panel, leaving it untouched if nothing changed"""
+        if widget.get('1.0', 'end-1c') == text:
+            return
+        widget.delete('1.0', tk.END)
+        widget.insert('1.0', text)
+    
+    def _refresh_current_tab(self, event=None):
+        """Rebuild the selected tab's display if it is out of date"""
+        current = self.notebook.index('current')
+        for key, (frame, update) in self._lazy_tabs.items():
+            if self._tab_dirty[key] and self.notebook.index(frame) == current:
+                update()
+                self._tab_dirty[key] = False
     
     def update_variable_tracking(self):
-        """Update the variable tracking display"""
-        # Clear previous data
-        for item in self.var_tree.get_children():
-            self.var_tree.delete(item)
+        """Update the variable tracking display, patching only the rows that changed"""
+        variables = self.dataflow_analyzer.variables if self.dataflow_analyzer else {}
         
-        if not self.dataflow_analyzer:
-            return
+        # Remove variables that no longer exist
+        for var_name in [name for name in self._var_tree_index if name not in variables]:
+            self.var_tree.delete(self._var_tree_index.pop(var_name)['iid'])
         
         # Group by variable name
-        for var_name, var_info in self.dataflow_analyzer.variables.items():
-            # Special display for pointer dereferences
-            if var_name.startswith('*'):
-                display_name = f"{var_name} (pointer deref)"
-                var_type = 'Ptr Deref'
-            else:
-                display_name = var_name
-                var_type = 'Variable'
+        for var_name, var_info in variables.items():
+            entry = self._var_tree_index.get(var_name)
+            if entry is None:
+                # Special display for pointer dereferences
+                if var_name.startswith('*'):
+                    display_name = f"{var_name} (pointer deref)"
+                    var_type = 'Ptr Deref'
+                else:
+                    display_name = var_name
+                    var_type = 'Variable'
                 
-            var_node = self.var_tree.insert('', 'end', text=display_name, values=(var_type, '', ''))
-            
-            # Add definitions
-            if var_info['definitions']:
-                def_node = self.var_tree.insert(var_node, 'end', text='Definitions', values=('', '', ''))
-                for line_num, details in var_info['definitions']:
-                    self.var_tree.insert(def_node, 'end', text=f"Line {line_num}", 
-                                       values=('DEF', line_num, details))
+                var_node = self.var_tree.insert('', 'end', text=display_name, values=(var_type, '', ''))
+                entry = self._var_tree_index[var_name] = {'iid': var_node, 'definitions': None, 'uses': None}
             
-            # Add uses
-            if var_info['uses']:
-                use_node = self.var_tree.insert(var_node, 'end', text='Uses', values=('', '', ''))
-                for line_num, details in var_info['uses']:
-                    self.var_tree.insert(use_node, 'end', text=f"Line {line_num}", 
-                                       values=('USE', line_num, details))
+            # Definitions are kept above uses
+            self._sync_var_tree_group(entry, 'definitions', 'Definitions', 'DEF', var_info['definitions'], 0)
+            self._sync_var_tree_group(entry, 'uses', 'Uses', 'USE', var_info['uses'], 'end')
+        
+        # Keep the tree in the analyzer's variable order
+        order = tuple(self._var_tree_index[var_name]['iid'] for var_name in variables)
+        if tuple(self.var_tree.get_children()) != order:
+            for position, iid in enumerate(order):
+                self.var_tree.move(iid, '', position)
+    
+    def _sync_var_tree_group(self, entry, key, label, ref_type, refs, index):
+        """Reconcile a Definitions/Uses group of a variable node with the given (line, details) list"""
+        group = entry[key]
+        if not refs:
+            if group:
+                self.var_tree.delete(group[0])
+                entry[key] = None
+            return
+        
+        if group is None:
+            group_node = self.var_tree.insert(entry['iid'], index, text=label, values=('', '', ''))
+            group = entry[key] = (group_node, [])
+        group_node, rows = group  # rows: [(iid, values)]
+        
+        for i, (line_num, details) in enumerate(refs):
+            values = (ref_type, line_num, details)
+            if i >= len(rows):
+                rows.append((self.var_tree.insert(group_node, 'end', text=f"Line {line_num}", values=values), values))
+            elif rows[i][1] != values:
+                self.var_tree.item(rows[i][0], text=f"Line {line_num}", values=values)
+                rows[i] = (rows[i][0], values)
+        
+        for iid, values in rows[len(refs):]:
+            self.var_tree.delete(iid)
+        del rows[len(refs):]
     
     def update_dependencies_display(self):
         """Update the dependencies display"""
-        self.deps_text.delete('1.0', tk.END)
-        
         if not self.dataflow_analyzer:
+            self._replace_text(self.deps_text, '')
             return
         
-        deps_output = []
-        deps_output.append("=== VARIABLE DEPENDENCIES ===\n")
+        buf = io.StringIO()
+        w = buf.write
+        w("=== VARIABLE DEPENDENCIES ===\n\n")
         
         # Variable dependencies
-        deps_output.append("Variable Dependencies:")
+        w("Variable Dependencies:\n")
         for var, deps in self.dataflow_analyzer.dependencies.items():
             if deps:
                 if var.startswith('*'):
-                    deps_output.append(f"  {var} (pointer dereference) depends on: {', '.join(deps)}")
+                    w(f"  {var} (pointer dereference) depends on: {', '.join(deps)}\n")
                 else:
-                    deps_output.append(f"  {var} depends on: {', '.join(deps)}")
+                    w(f"  {var} depends on: {', '.join(deps)}\n")
             else:
-                deps_output.append(f"  {var} has no dependencies")
+                w(f"  {var} has no dependencies\n")
         
-        deps_output.append("\n=== LINE-BY-LINE DATAFLOW ANALYSIS ===")
+        w("\n=== LINE-BY-LINE DATAFLOW ANALYSIS ===\n")
         for line_num in sorted(self.dataflow_analyzer.line_analysis.keys()):
             analysis = self.dataflow_analyzer.line_analysis[line_num]
-            deps_output.append(f"\nLine {line_num}:")
+            w(f"\nLine {line_num}:\n")
             if analysis['reads']:
-                deps_output.append(f"  READS: {', '.join(analysis['reads'])}")
+                w(f"  READS: {', '.join(analysis['reads'])}\n")
             if analysis['writes']:
-                deps_output.append(f"  WRITES: {', '.join(analysis['writes'])}")
+                w(f"  WRITES: {', '.join(analysis['writes'])}\n")
             if analysis['operation']:
-                deps_output.append(f"  OPERATION: {analysis['operation']}")
+                w(f"  OPERATION: {analysis['operation']}\n")
         
-        deps_output.append("\n=== REACHING DEFINITIONS ===")
+        w("\n=== REACHING DEFINITIONS ===\n")
         for line_num in sorted(self.dataflow_analyzer.reaching_definitions.keys()):
             reaching = self.dataflow_analyzer.reaching_definitions[line_num]
             if reaching:
-                deps_output.append(f"Line {line_num} uses definitions from: {', '.join(reaching)}")
+                w(f"Line {line_num} uses definitions from: {', '.join(reaching)}\n")
         
-        self.deps_text.insert('1.0', '\n'.join(deps_output))
+        self._replace_text(self.deps_text, buf.getvalue()[:-1])  # Drop the final newline
     
     def update_linked_list_display(self):
         """Update the C linked list operation sequence display"""
-        self.linked_list_text.delete('1.0', tk.END)
-        
         if not self.dataflow_analyzer:
+            self._replace_text(self.linked_list_text, '')
             return
         
         operations = self.dataflow_analyzer.build_operation_sequence()
         
-        output = []
-        output.append("=== C LINKED LIST OPERATION SEQUENCE ===\n")
-        output.append("Operation Types: WRITE (define), READ (use), KILL (destroy/redefine)")
-        output.append(f"Total Operations: {len(operations)}")
-        output.append("List Head: " + (str(operations[0]['operation_id']) if operations else "NULL"))
-        output.append("\n" + "="*60)
+        buf = io.StringIO()
+        w = buf.write
+        w("=== C LINKED LIST OPERATION SEQUENCE ===\n\n")
+        w("Operation Types: WRITE (define), READ (use), KILL (destroy/redefine)\n")
+        w(f"Total Operations: {len(operations)}\n")
+        w("List Head: " + (str(operations[0]['operation_id']) if operations else "NULL") + "\n")
+        w("\n" + "="*60 + "\n")
         
         for i, op in enumerate(operations):
             next_ptr = f"&node_{op['next']}" if op['next'] is not None else "NULL"
-            output.append(f"\nNode {i} (ID: {op['operation_id']}):")
-            output.append(f"  Variable: {op['variable_name']}")
-            output.append(f"  Operation: {op['operation']}")
-            output.append(f"  Line: {op['line_number']}")
-            output.append(f"  Details: {op['details']}")
-            output.append(f"  Next: {next_ptr}")
-        
-        output.append("\n" + "="*60)
-        output.append("C Structure Definition:")
-        output.append("typedef enum { WRITE, READ, KILL } operation_types;")
-        output.append("struct operation_element {")
-        output.append("    int operation_id;")
-        output.append("    char* variable_name;") 
-        output.append("    operation_types operation;")
-        output.append("    int line_number;")
-        output.append("    char* details;")
-        output.append("    struct operation_element* next;")
-        output.append("};")
-        
-        self.linked_list_text.insert('1.0', '\n'.join(output))
+            w(f"\nNode {i} (ID: {op['operation_id']}):\n")
+            w(f"  Variable: {op['variable_name']}\n")
+            w(f"  Operation: {op['operation']}\n")
+            w(f"  Line: {op['line_number']}\n")
+            w(f"  Details: {op['details']}\n")
+            w(f"  Next: {next_ptr}\n")
+        
+        w("\n" + "="*60 + "\n")
+        w("C Structure Definition:\n")
+        w("typedef enum { WRITE, READ, KILL } operation_types;\n")
+        w("struct operation_element {\n")
+        w("    int operation_id;\n")
+        w("    char* variable_name;\n")
+        w("    operation_types operation;\n")
+        w("    int line_number;\n")
+        w("    char* details;\n")
+        w("    struct operation_element* next;\n")
+        w("};\n")
+        
+        self._replace_text(self.linked_list_text, buf.getvalue()[:-1])  # Drop the final newline
     
     def update_tta_blocks_display(self):
         """Update the TTA blocks display"""
-        self.tta_text.delete('1.0', tk.END)
-        
         if not self.tta_analyzer:
+            self._replace_text(self.tta_text, '')
             return
         
-        output = []
-        output.append("=== TTA GRAPH BLOCKS & ARCS ===\n")
-        output.append(f"Total Blocks: {len(self.tta_analyzer.blocks)}")
-        output.append(f"Total Arcs: {len(self.tta_analyzer.arcs)}")
-        output.append("\n" + "="*60)
+        buf = io.StringIO()
+        w = buf.write
+        w("=== TTA GRAPH BLOCKS & ARCS ===\n\n")
+        w(f"Total Blocks: {len(self.tta_analyzer.blocks)}\n")
+        w(f"Total Arcs: {len(self.tta_analyzer.arcs)}\n")
+        w("\n" + "="*60 + "\n")
         
         # Display blocks
-        output.append("\n📦 BLOCKS:")
+        w("\n📦 BLOCKS:\n")
         for i, block in enumerate(self.tta_analyzer.blocks):
-            output.append(f"\nBlock {i} (Type: {block['node_type']}):")
-            output.append(f"  Lines: {block['start_line']}-{block['end_line']}")
-            output.append(f"  Code Preview: {block['code_preview']}")
+            w(f"\nBlock {i} (Type: {block['node_type']}):\n")
+            w(f"  Lines: {block['start_line']}-{block['end_line']}\n")
+            w(f"  Code Preview: {block['code_preview']}\n")
             if block['operation_sequence']:
-                output.append(f"  Operations: {len(block['operation_sequence'])} ops")
+                w(f"  Operations: {len(block['operation_sequence'])} ops\n")
         
         # Display arcs
-        output.append(f"\n🔗 ARCS:")
+        w(f"\n🔗 ARCS:\n")
         for arc in self.tta_analyzer.arcs:
             arc_type = arc['arc_type']
             symbol = "→" if arc_type == "solid" else ("--→" if arc_type == "dashed" else "⋯→")
-            output.append(f"  Block{arc['from']} {symbol} Block{arc['to']} ({arc_type}: {arc['description']})")
+            w(f"  Block{arc['from']} {symbol} Block{arc['to']} ({arc_type}: {arc['description']})\n")
         
-        output.append("\n" + "="*60)
-        output.append("Node Types: START, END, ACTIVITY, XOR, LOOP, BLOCK")
-        output.append("Arc Types: solid (sequential), dashed (conditional), dotted (loop back)")
+        w("\n" + "="*60 + "\n")
+        w("Node Types: START, END, ACTIVITY, XOR, LOOP, BLOCK\n")
+        w("Arc Types: solid (sequential), dashed (conditional), dotted (loop back)\n")
         
-        self.tta_text.insert('1.0', '\n'.join(output))
+        self._replace_text(self.tta_text, buf.getvalue()[:-1])  # Drop the final newline
     
-    def highlight_definitions_and_uses(self):
-        """Highlight variable definitions and uses in the editor"""
+    def highlight_definitions_and_uses(self, lines, first_line=1, last_line=None):
+        """Highlight variable definitions and uses in the editor using the already-split buffer lines"""
         if not self.dataflow_analyzer:
             return
         
-        # Highlight definitions
-        for var_name, var_info in self.dataflow_analyzer.variables.items():
-            for line_num, details in var_info['definitions']:
-                line_start = f"{line_num}.0"
-                line_end = f"{line_num}.end"
-                line_content = self.text_editor.get(line_start, line_end)
-                
-                # Skip if this line is a comment
-                if line_content.strip().startswith('//'):
-                    continue
-                
-                # Find the variable name in the line but skip comments
-                comment_pos = line_content.find('//')
-                search_area = line_content[:comment_pos] if comment_pos != -1 else line_content
-                
-                var_pos = search_area.find(var_name)
-                if var_pos != -1:
-                    # Check if it's a whole word
-                    if ((var_pos == 0 or not search_area[var_pos-1].isalnum() and search_area[var_pos-1] != '_') and 
-                        (var_pos + len(var_name) >= len(search_area) or 
-                         not search_area[var_pos + len(var_name)].isalnum() and search_area[var_pos + len(var_name)] != '_')):
-                        start = f"{line_num}.{var_pos}"
-                        end = f"{line_num}.{var_pos + len(var_name)}"
-                        self.text_editor.tag_add('definition', start, end)
-            
-            # Highlight uses
-            for line_num, details in var_info['uses']:
-                line_start = f"{line_num}.0"
-                line_end = f"{line_num}.end"
-                line_content = self.text_editor.get(line_start, line_end)
-                
-                # Skip if this line is a comment
-                if line_content.strip().startswith('//'):
-                    continue
-                
-                # Find variables only before any comment
-                comment_pos = line_content.find('//')
-                search_area = line_content[:comment_pos] if comment_pos != -1 else line_content
-                
-                # Find all occurrences of the variable in the non-comment part
-                pos = 0
-                while True:
-                    var_pos = search_area.find(var_name, pos)
-                    if var_pos == -1:
-                        break
-                    # Check if it's a whole word (not part of another identifier)
-                    if ((var_pos == 0 or not search_area[var_pos-1].isalnum() and search_area[var_pos-1] != '_') and 
-                        (var_pos + len(var_name) >= len(search_area) or 
-                         not search_area[var_pos + len(var_name)].isalnum() and search_area[var_pos + len(var_name)] != '_')):
-                        start = f"{line_num}.{var_pos}"
-                        end = f"{line_num}.{var_pos + len(var_name)}"
-                        self.text_editor.tag_add('use', start, end)
-                    pos = var_pos + 1
+        ranges = defaultdict(list)
+        index = "{}.{}".format  # Tk "line.column" index
+        
+        # Code part (before any // comment) of each line in range, skipping comment-only lines
+        search_areas = {}
+        for line_num, line_content in enumerate(lines[first_line - 1:last_line], first_line):
+            if not line_content.lstrip().startswith('//'):
+                search_areas[line_num] = line_content.split('//', 1)[0]
+        
+        # Only the definitions and uses recorded on these lines need to be looked at
+        for line_num, search_area in search_areas.items():
+            for kind, var_name, details in self.dataflow_analyzer.line_events(line_num):
+                if kind == 'definitions':
+                    # Highlight the first whole-word occurrence
+                    span = next(self._find_whole_word(var_name, search_area), None)
+                    if span:
+                        start = index(line_num, span[0])
+                        end = index(line_num, span[1])
+                        ranges['definition'].extend((start, end))
+                else:
+                    # Find all whole-word occurrences of the variable in the non-comment part
+                    for var_start, var_end in self._find_whole_word(var_name, search_area):
+                        start = index(line_num, var_start)
+                        end = index(line_num, var_end)
+                        ranges['use'].extend((start, end))
+        
+        for tag, indices in ranges.items():
+            self.text_editor.tag_add(tag, *indices)
+    
+    def _find_whole_word(self, var_name, search_area):
+        """Yield (start, end) spans of var_name where it is not part of another identifier"""
+        for match in self.dataflow_analyzer.get_word_pattern(var_name).finditer(search_area):
+            yield match.span()
     
     def highlight_block_boundaries(self):
         """Highlight TTA block boundaries in the editor"""
         if not self.tta_analyzer:
             return
         
+        # Collect ranges per tag so each tag is applied in a single call
+        ranges = defaultdict(list)
         for block in self.tta_analyzer.blocks:
             # Highlight block start
             start_line = block['start_line']
-            start_pos = f"{start_line}.0"
-            start_end = f"{start_line}.end"
-            self.text_editor.tag_add('block_start', start_pos, start_end)
+            ranges['block_start'].extend((f"{start_line}.0", f"{start_line}.end"))
             
             # Highlight block end if different from start
             end_line = block['end_line']
             if end_line != start_line:
-                end_pos = f"{end_line}.0"
-                end_end = f"{end_line}.end"
-                self.text_editor.tag_add('block_end', end_pos, end_end)
+                ranges['block_end'].extend((f"{end_line}.0", f"{end_line}.end"))
+        
+        for tag, indices in ranges.items():
+            self.text_editor.tag_add(tag, *indices)
     
     def generate_dependency_graph(self):
         """Generate and display dependency graph"""
@@ -722,29 +1092,20 @@ int main() {
             messagebox.showerror("Error", "No dataflow analysis available")
             return
         
-        # Clear existing graph
-        for widget in self.graph_canvas_frame.winfo_children():
-            widget.destroy()
-        
         try:
-            # Close any existing matplotlib figures
-            plt.close('all')
-            
             # Create networkx graph
-            G = nx.DiGraph()
+            G = self._build_dependency_graph()
             
-            # Add nodes and edges based on dependencies
-            for var, deps in self.dataflow_analyzer.dependencies.items():
-                G.add_node(var)
-                for dep in deps:
-                    G.add_edge(dep, var)
+            # Nothing to redraw if the canvas already shows this graph
+            graph_key = (frozenset(G.nodes), frozenset(G.edges))
+            if self._graph_drawn.get(self.graph_canvas_frame) == graph_key:
+                return
             
-            # Create matplotlib figure
-            fig, ax = plt.subplots(figsize=(10, 6))
-            fig.patch.set_facecolor('white')
+            # Reuse the embedded matplotlib figure
+            fig, ax, canvas = self._get_graph_figure(self.graph_canvas_frame, (10, 6))
             
             if G.nodes():
-                pos = nx.spring_layout(G, k=2, iterations=50)
+                pos = self._get_dependency_layout(G)
                 
                 # Different colors for pointer dereferences
                 node_colors = []
@@ -770,12 +1131,9 @@ int main() {
                 ax.set_title("Variable Dependency Graph", fontsize=12, fontweight='bold')
             
             ax.axis('off')
-            plt.tight_layout()
-            
-            # Embed in tkinter
-            canvas = FigureCanvasTkAgg(fig, self.graph_canvas_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            fig.tight_layout()
+            canvas.draw_idle()
+            self._graph_drawn[self.graph_canvas_frame] = graph_key
             
             # Store canvas reference for cleanup
             self.current_canvas = canvas
@@ -789,78 +1147,91 @@ int main() {
             messagebox.showerror("Error", "No TTA analysis available")
             return
         
-        # Clear existing graph
-        for widget in self.tta_graph_canvas_frame.winfo_children():
-            widget.destroy()
-        
         try:
-            # Close any existing matplotlib figures
-            plt.close('all')
+            blocks = self.tta_analyzer.blocks
+            arcs = self.tta_analyzer.arcs
+            xor_branches = None
+            contracted = 0
+            if len(blocks) > 100:
+                # Too many blocks to show one by one: contract single-entry, single-exit runs
+                blocks, arcs, xor_branches = self._coarsen_blocks()
+                contracted = len(self.tta_analyzer.blocks) - len(blocks)
+            
+            # Create custom hierarchical layout
+            pos = self.create_hierarchical_layout(blocks, xor_branches)
+            
+            # Nothing to redraw if the canvas already shows these blocks, arcs and positions
+            graph_key = (tuple((block['node_type'], block['start_line'], block['end_line'])
+                               for block in blocks),
+                         tuple((arc['from'], arc['to'], arc['arc_type']) for arc in arcs),
+                         tuple(sorted(pos.items())))
+            if self._graph_drawn.get(self.tta_graph_canvas_frame) == graph_key:
+                return
             
             # Calculate figure size based on number of blocks
-            num_blocks = len(self.tta_analyzer.blocks)
-            fig_height = max(12, num_blocks * 0.8)  # Scale height with number of blocks
+            num_blocks = len(blocks)
+            fig_height = min(30, max(12, num_blocks * 0.8))  # Scale height with number of blocks
             fig_width = max(16, 16 + (num_blocks - 20) * 0.2) if num_blocks > 20 else 16
             
-            # Create matplotlib figure with dynamic size
-            fig, ax = plt.subplots(figsize=(fig_width, fig_height))
-            fig.patch.set_facecolor('white')
-            
-            if self.tta_analyzer.blocks:
-                # Check for extremely large graphs
-                if num_blocks > 100:
+            # Check for extremely large graphs before the canvas is cleared; the answer holds
+            # until the block structure changes
+            draw_graph = True
+            if num_blocks > 100:
+                structure_key = self.tta_analyzer.structure_key()
+                if self._large_graph_answer is None or self._large_graph_answer[0] != structure_key:
                     response = messagebox.askyesno(
-                        "Large Graph Warning", 
+                        "Large Graph Warning",
                         f"This graph has {num_blocks} blocks and may be difficult to view.\n\n"
                         "Would you like to continue? (Consider using 'Save TTA Graph' for better viewing)"
                     )
-                    if not response:
-                        return
-                
-                # Create custom hierarchical layout
-                pos = self.create_hierarchical_layout()
+                    self._large_graph_answer = (structure_key, bool(response))
+                draw_graph = self._large_graph_answer[1]
+            
+            # Reuse the embedded matplotlib figure (the size only applies when it is first created)
+            fig, ax, canvas = self._get_graph_figure(self.tta_graph_canvas_frame, (fig_width, fig_height))
+            self._tta_display = None
+            if self._tta_click_cid is None:
+                self._tta_click_cid = canvas.mpl_connect('button_press_event', self._on_tta_graph_click)
+            
+            if not draw_graph:
+                ax.text(0.5, 0.5, f"TTA graph with {num_blocks} blocks not shown\n"
+                                  "Use 'Save TTA Graph' to view it",
+                        horizontalalignment='center', verticalalignment='center',
+                        transform=ax.transAxes, fontsize=14)
+                ax.axis('off')
+                canvas.draw_idle()
+                self._graph_drawn[self.tta_graph_canvas_frame] = graph_key
+                return
+            
+            if blocks:
+                # Adaptive node sizing based on graph complexity
+                if num_blocks <= 20:
+                    box_width, box_height = 2.4, 1.0
+                    font_size = 10
+                elif num_blocks <= 40:
+                    box_width, box_height = 2.8, 1.2
+                    font_size = 9
+                else:
+                    box_width, box_height = 3.2, 1.4
+                    font_size = 8
                 
-                # Draw nodes with better sizing
-                for i, block in enumerate(self.tta_analyzer.blocks):
+                # Draw nodes with better sizing; the boxes are added as one collection
+                boxes = []
+                for i, block in enumerate(blocks):
                     x, y = pos[i]
                     
-                    # Adaptive node sizing based on graph complexity
-                    if num_blocks <= 20:
-                        box_width, box_height = 2.4, 1.0
-                        font_size = 10
-                    elif num_blocks <= 40:
-                        box_width, box_height = 2.8, 1.2
-                        font_size = 9
-                    else:
-                        box_width, box_height = 3.2, 1.4
-                        font_size = 8
-                    
                     # Color nodes by type
-                    if block['node_type'] == 'START':
-                        color = 'lightgreen'
-                        edge_color = 'darkgreen'
-                    elif block['node_type'] == 'END':
-                        color = 'lightcoral'
-                        edge_color = 'darkred'
-                    elif block['node_type'] == 'XOR':
-                        color = 'lightyellow'
-                        edge_color = 'orange'
-                    elif block['node_type'] == 'LOOP':
-                        color = 'lightblue'
-                        edge_color = 'darkblue'
-                    else:  # ACTIVITY, BLOCK
-                        color = 'lightgray'
-                        edge_color = 'gray'
+                    color, edge_color = TTA_NODE_COLORS.get(block['node_type'], TTA_DEFAULT_NODE_COLORS)
                     
                     # Draw node as rectangle with rounded corners
                     box = FancyBboxPatch((x-box_width/2, y-box_height/2), box_width, box_height,
-                                        boxstyle="round,pad=0.1",
+                                        boxstyle=TTA_BOX_STYLE,
                                         facecolor=color,
                                         edgecolor=edge_color,
                                         linewidth=2,
                                         alpha=0.9,
                                         zorder=2)
-                    ax.add_patch(box)
+                    boxes.append(box)
                     
                     # Add label with better formatting - use line numbers only for very large graphs
                     if num_blocks > 50:
@@ -870,15 +1241,25 @@ int main() {
                     ax.text(x, y, label, ha='center', va='center', fontsize=font_size, 
                            fontweight='bold', zorder=3)
                 
+                ax.add_collection(PatchCollection(boxes, match_original=True, zorder=2))
+                
+                # Arrows connect to the box edges, which are the same for every node
+                y_offset = box_height / 2
+                x_offset = box_width / 2
+                
+                # Connection points of all arcs at once: the vertical edges facing each other,
+                # shifted sideways towards the other node for diagonal arrows
+                from_points = np.array([pos[arc['from']] for arc in arcs], dtype=float).reshape(-1, 2)
+                to_points = np.array([pos[arc['to']] for arc in arcs], dtype=float).reshape(-1, 2)
+                deltas = to_points - from_points
+                shifts = np.column_stack((np.sign(deltas[:, 0]) * (x_offset * 0.8),
+                                          np.where(deltas[:, 1] < 0, -y_offset, y_offset)))
+                from_points += shifts
+                to_points -= shifts
+                
                 # Draw edges with different styles and curves
-                for arc in self.tta_analyzer.arcs:
-                    from_pos = pos[arc['from']]
-                    to_pos = pos[arc['to']]
-                    
-                    # Calculate control points for curved arrows
-                    dx = to_pos[0] - from_pos[0]
-                    dy = to_pos[1] - from_pos[1]
-                    
+                for arc, (from_x, from_y), (to_x, to_y), dx in zip(arcs, from_points.tolist(), to_points.tolist(),
+                                                                   deltas[:, 0].tolist()):
                     # Set edge style and color based on arc type - adjust for graph size
                     if arc['arc_type'] == 'solid':
                         color = 'black'
@@ -901,36 +1282,6 @@ int main() {
                         # Loop backs need more curve
                         connectionstyle = "arc3,rad=-0.5"  # Negative for opposite curve
                     
-                    # Get node dimensions for this block
-                    if num_blocks <= 20:
-                        box_w, box_h = 2.4, 1.0
-                    elif num_blocks <= 40:
-                        box_w, box_h = 2.8, 1.2
-                    else:
-                        box_w, box_h = 3.2, 1.4
-                    
-                    # Adjust arrow positions to connect to box edges
-                    y_offset = box_h / 2
-                    x_offset = box_w / 2
-                    
-                    # Calculate connection points
-                    if dy < 0:  # Arrow going down
-                        from_y = from_pos[1] - y_offset
-                        to_y = to_pos[1] + y_offset
-                    else:  # Arrow going up
-                        from_y = from_pos[1] + y_offset
-                        to_y = to_pos[1] - y_offset
-                    
-                    if dx > 0:  # Arrow going right
-                        from_x = from_pos[0] + x_offset * 0.8
-                        to_x = to_pos[0] - x_offset * 0.8
-                    elif dx < 0:  # Arrow going left
-                        from_x = from_pos[0] - x_offset * 0.8
-                        to_x = to_pos[0] + x_offset * 0.8
-                    else:  # Vertical arrow
-                        from_x = from_pos[0]
-                        to_x = to_pos[0]
-                    
                     # Draw arrow with curve
                     ax.annotate('', xy=(to_x, to_y), xytext=(from_x, from_y),
                                arrowprops=dict(arrowstyle='->', 
@@ -961,22 +1312,18 @@ int main() {
                          borderaxespad=0)
                 
                 # Set axis limits with padding (more padding for large graphs)
-                all_x = [p[0] for p in pos.values()]
-                all_y = [p[1] for p in pos.values()]
+                points = np.array(list(pos.values()), dtype=float)
+                (low_x, low_y), (high_x, high_y) = points.min(axis=0), points.max(axis=0)
                 
                 x_padding = 3 if num_blocks > 30 else 2
                 y_padding = 2 if num_blocks > 30 else 1.5
                 
-                x_min, x_max = min(all_x) - x_padding, max(all_x) + x_padding
-                y_min, y_max = min(all_y) - y_padding, max(all_y) + y_padding
+                x_min, x_max = low_x - x_padding, high_x + x_padding
+                y_min, y_max = low_y - y_padding, high_y + y_padding
                 
                 ax.set_xlim(x_min, x_max)
                 ax.set_ylim(y_min, y_max)
                 
-                # Add grid for better visibility (less prominent for large graphs)
-                grid_alpha = 0.1 if num_blocks > 30 else 0.2
-                ax.grid(True, alpha=grid_alpha, linestyle='--')
-                
             else:
                 ax.text(0.5, 0.5, 'No blocks found', 
                        horizontalalignment='center', verticalalignment='center',
@@ -988,21 +1335,19 @@ int main() {
             else:
                 ax.set_aspect('equal')
             ax.axis('off')
-            plt.tight_layout(rect=[0, 0.05, 1, 0.98])  # Adjusted spacing without title
-            
-            # Embed in tkinter with size constraints
-            canvas = FigureCanvasTkAgg(fig, self.tta_graph_canvas_frame)
-            canvas.draw()
-            
-            # Get the canvas widget and limit its size
-            canvas_widget = canvas.get_tk_widget()
+            fig.tight_layout(rect=[0, 0.05, 1, 0.98])  # Adjusted spacing without title
             
             # Set maximum display size to prevent UI issues
             max_height = 600  # Maximum height in pixels
             if fig_height > 10:  # If figure is very tall
-                canvas_widget.config(height=max_height)
+                canvas.get_tk_widget().config(height=max_height)
             
-            canvas_widget.pack(fill=tk.BOTH, expand=True)
+            canvas.draw_idle()
+            self._graph_drawn[self.tta_graph_canvas_frame] = graph_key
+            if contracted:
+                self._tta_display = (blocks, pos, (box_width, box_height))
+                self.status_bar.config(text=f"TTA graph: {contracted} blocks contracted "
+                                            "(double-click a node to expand it, 'Save TTA Graph' shows every block)")
             
             # Store canvas reference for cleanup
             self.current_canvas = canvas
@@ -1010,46 +1355,220 @@ int main() {
         except Exception as e:
             messagebox.showerror("TTA Graph Error", f"Could not generate TTA graph: {str(e)}")
     
-    def create_hierarchical_layout(self):
-        """Create a clean hierarchical layout for TTA blocks with better spacing"""
+    def _build_dependency_graph(self):
+        """Build the variable dependency DiGraph (edges point from a dependency to the dependent variable)
+        
+        The graph is kept until the next analysis, so saving reuses the one that was displayed.
+        """
+        if self._dependency_graph is not None:
+            return self._dependency_graph
+        
+        nodes = []
+        edges = []
+        for var, deps in self.dataflow_analyzer.dependencies.items():
+            nodes.append(var)
+            nodes.extend(deps)
+            edges.extend((dep, var) for dep in deps)
+        
+        G = nx.DiGraph()
+        G.add_nodes_from(nodes)
+        G.add_edges_from(edges)
+        self._dependency_graph = G
+        return G
+    
+    def _get_dependency_layout(self, G):
+        """Return a spring layout for the dependency graph, cached by its node and edge sets
+        
+        Larger graphs get fewer iterations; very large ones start from a spectral layout,
+        which is already close to the final placement. Layouts of large graphs are also
+        cached on disk across sessions.
+        """
+        key = (frozenset(G.nodes), frozenset(G.edges))
+        pos = self._layout_cache.get(key)
+        if pos is not None:
+            return pos
+        
+        if len(self._layout_cache) >= 32:
+            self._layout_cache.clear()
+        num_nodes = len(G)
+        cache_path = None
+        if LAYOUT_DISK_CACHE_ENABLED and num_nodes >= LAYOUT_DISK_CACHE_MIN_NODES:
+            cache_path = layout_cache_path(G.nodes, G.edges)
+        if cache_path is not None:
+            pos = load_cached_layout(cache_path)
+        if pos is None:
+            if num_nodes < 100:
+                pos = nx.spring_layout(G, k=2, iterations=50, seed=42)
+            elif num_nodes < 1000:
+                pos = nx.spring_layout(G, k=2, iterations=30, seed=42)
+            else:
+                pos = nx.spring_layout(G, k=2, pos=nx.spectral_layout(G), iterations=15, seed=42)
+            if cache_path is not None:
+                store_cached_layout(cache_path, pos)
+        self._layout_cache[key] = pos
+        return pos
+    
+    def _coarsen_blocks(self):
+        """Contract runs of consecutive TTA blocks into single nodes to keep large graphs readable
+        
+        A run is only contracted if it is entered at its first block and left towards the
+        block right after it, and it holds no START, END or LOOP block. Run length is capped
+        so that straight-line code shrinks to about 60 nodes; loops and branches stay, so
+        loop-heavy code can keep several hundred. Blocks in self._expanded_blocks are never
+        contracted.
+        Returns (blocks, arcs, xor_branches) for the contracted graph.
+        """
+        blocks = self.tta_analyzer.blocks
+        arcs = self.tta_analyzer.arcs
+        max_run = max(2, -(-len(blocks) // 60))
+        
+        in_arcs = defaultdict(list)
+        out_arcs = defaultdict(list)
+        for arc in arcs:
+            in_arcs[arc['to']].append(arc['from'])
+            out_arcs[arc['from']].append(arc['to'])
+        
+        def can_contract(block):
+            return block['node_type'] not in ('START', 'END', 'LOOP') and block['start_line'] not in self._expanded_blocks
+        
+        def is_single_entry_exit(first, last):
+            for k in range(first, last + 1):
+                if k > first and any(src < first or src > last for src in in_arcs[k]):
+                    return False
+                if any(dst != last + 1 and not first <= dst <= last for dst in out_arcs[k]):
+                    return False
+            return True
+        
+        coarse_blocks = []
+        block_map = {}  # {original block index: coarse block index}
+        i = 0
+        while i < len(blocks):
+            j = i
+            if can_contract(blocks[i]):
+                for last in range(i + 1, min(i + max_run, len(blocks))):
+                    if not can_contract(blocks[last]):
+                        break
+                    if is_single_entry_exit(i, last):
+                        j = last
+            
+            for k in range(i, j + 1):
+                block_map[k] = len(coarse_blocks)
+            if j == i:
+                coarse_blocks.append(blocks[i])
+            else:
+                coarse_blocks.append({
+                    'node_type': 'ACTIVITY',
+                    'start_line': blocks[i]['start_line'],
+                    'end_line': blocks[j]['end_line'],
+                    'lines': [line for block in blocks[i:j + 1] for line in block['lines']],
+                    'contracted_lines': [block['start_line'] for block in blocks[i:j + 1]]
+                })
+            i = j + 1
+        
+        coarse_arcs = []
+        seen = set()
+        for arc in arcs:
+            key = (block_map[arc['from']], block_map[arc['to']], arc['arc_type'])
+            if key[0] == key[1] and arc['from'] != arc['to']:
+                continue  # Flow inside a contracted run
+            if key not in seen:
+                seen.add(key)
+                coarse_arcs.append({'from': key[0], 'to': key[1], 'arc_type': key[2],
+                                    'description': arc['description']})
+        
+        xor_branches = {}
+        for i, block in enumerate(blocks):
+            if block['node_type'] == 'XOR' and coarse_blocks[block_map[i]] is block:
+                branches = []
+                for branch in self._find_xor_branches(i):
+                    if block_map[branch] not in branches:
+                        branches.append(block_map[branch])
+                xor_branches[block_map[i]] = branches
+        
+        return coarse_blocks, coarse_arcs, xor_branches
+    
+    def _on_tta_graph_click(self, event):
+        """Show the blocks of a contracted run again when it is double-clicked in the TTA graph"""
+        if not event.dblclick or event.xdata is None or not self._tta_display:
+            return
+        
+        blocks, pos, (box_w, box_h) = self._tta_display
+        for i, block in enumerate(blocks):
+            x, y = pos[i]
+            if 'contracted_lines' in block and abs(event.xdata - x) <= box_w / 2 and abs(event.ydata - y) <= box_h / 2:
+                self._expanded_blocks.update(block['contracted_lines'])
+                self.generate_tta_graph()
+                return
+    
+    def _get_graph_figure(self, frame, figsize):
+        """Return the embedded (figure, axes, canvas) for a graph frame, cleared for redrawing"""
+        if frame not in self._graph_canvases:
+            fig = Figure(figsize=figsize)
+            canvas = FigureCanvasTkAgg(fig, frame)
+            canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            self._graph_canvases[frame] = (fig, canvas)
+        
+        fig, canvas = self._graph_canvases[frame]
+        fig.clear()
+        self._graph_drawn.pop(frame, None)
+        fig.patch.set_facecolor('white')
+        ax = fig.add_subplot(111)
+        return fig, ax, canvas
+    
+    def create_hierarchical_layout(self, blocks=None, xor_branches=None):
+        """Create a clean hierarchical layout for TTA blocks with better spacing
+        
+        Lays out the analyzer's blocks unless a contracted graph passes its own blocks
+        together with the branch targets of its XOR nodes.
+        """
+        if blocks is None:
+            blocks = self.tta_analyzer.blocks
+        
+        # The layout only depends on the block types and XOR branches, which the
+        # analyzer's structure key covers - reuse it while that stays the same
+        structure_key = None
+        if xor_branches is None and blocks is self.tta_analyzer.blocks:
+            structure_key = self.tta_analyzer.structure_key()
+            cached = self._tta_layout_cache
+            if cached is not None and cached[0] == structure_key:
+                return cached[1]
         pos = {}
         
         # Calculate dynamic spacing based on number of blocks
-        num_blocks = len(self.tta_analyzer.blocks)
+        num_blocks = len(blocks)
         
         # Adaptive spacing parameters
-        if num_blocks <= 15:
-            x_center = 6
-            x_branch_offset = 4
-            y_spacing = 2.5
-        elif num_blocks <= 30:
-            x_center = 8
-            x_branch_offset = 5
-            y_spacing = 3.5
-        else:
-            x_center = 10
-            x_branch_offset = 6
-            y_spacing = 4.5
+        x_center, x_branch_offset, y_spacing = tta_layout_spacing(num_blocks)
         
         # Extra spacing for readability
         y_branch_extra = y_spacing * 0.6
         
+        # Vertical steps used by the loop below
+        xor_step = y_spacing * 2.5 + y_branch_extra  # More space after XOR branches
+        end_y = y_spacing * 2  # More space from bottom
+        
         # Start from top with dynamic spacing
         y_level = num_blocks * y_spacing * 1.2  # Extra margin at top
         
-        # Track which blocks we've positioned
-        positioned = set()
+        # Track which blocks we've positioned (1 = placed)
+        positioned = bytearray(num_blocks)
         
         # First pass: identify all XOR blocks and their branches
-        xor_blocks = []
-        for i, block in enumerate(self.tta_analyzer.blocks):
-            if block['node_type'] == 'XOR':
-                branches = self._find_xor_branches(i)
-                xor_blocks.append((i, branches))
+        if xor_branches is None:
+            xor_branches = {}
+            for i, block in enumerate(blocks):
+                if block['node_type'] == 'XOR':
+                    xor_branches[i] = self._find_xor_branches(i)
+        
+        # An activity is a merge point once it is past the branches of any XOR;
+        # an XOR without branches (other than block 0) marks every activity
+        branch_ends = [max(branches) for branches in xor_branches.values() if branches]
+        merge_after = min(branch_ends) if branch_ends else None
+        always_merge = any(xor_idx and not branches for xor_idx, branches in xor_branches.items())
         
         # Position blocks level by level
-        for i, block in enumerate(self.tta_analyzer.blocks):
-            if i in positioned:
+        for i, block in enumerate(blocks):
+            if positioned[i]:
                 continue
                 
             block_type = block['node_type']
@@ -1058,51 +1577,47 @@ int main() {
                 # START at the very top center
                 pos[i] = (x_center, y_level)
                 y_level -= y_spacing
-                positioned.add(i)
+                positioned[i] = 1
                 
             elif block_type == 'LOOP':
                 # LOOP blocks get center position with extra space
                 pos[i] = (x_center, y_level)
                 y_level -= y_spacing
-                positioned.add(i)
+                positioned[i] = 1
                 
             elif block_type == 'XOR':
                 # XOR blocks get center position
                 pos[i] = (x_center, y_level)
                 
                 # Find branches for this XOR
-                branches = self._find_xor_branches(i)
+                branches = xor_branches[i]
                 
                 # Position branches with more horizontal separation
                 branch_y = y_level - y_spacing
                 
-                if len(branches) >= 1 and branches[0] not in positioned:
+                if len(branches) >= 1 and not positioned[branches[0]]:
                     # True branch to the left
                     pos[branches[0]] = (x_center - x_branch_offset, branch_y)
-                    positioned.add(branches[0])
+                    positioned[branches[0]] = 1
                 
-                if len(branches) >= 2 and branches[1] not in positioned:
+                if len(branches) >= 2 and not positioned[branches[1]]:
                     # False branch to the right
                     pos[branches[1]] = (x_center + x_branch_offset, branch_y)
-                    positioned.add(branches[1])
+                    positioned[branches[1]] = 1
                 
                 # Extra space after branches
-                y_level -= (y_spacing * 2.5 + y_branch_extra)  # More space after XOR branches
-                positioned.add(i)
+                y_level -= xor_step
+                positioned[i] = 1
                 
             elif block_type == 'END':
                 # END at the bottom with adequate spacing
-                pos[i] = (x_center, y_spacing * 2)  # More space from bottom
-                positioned.add(i)
+                pos[i] = (x_center, end_y)
+                positioned[i] = 1
                 
             else:  # ACTIVITY
-                if i not in positioned:
+                if not positioned[i]:
                     # Check if this is a merge point after branches
-                    is_merge = False
-                    for xor_idx, branches in xor_blocks:
-                        if i > max(branches) if branches else xor_idx:
-                            is_merge = True
-                            break
+                    is_merge = always_merge or (merge_after is not None and i > merge_after)
                     
                     # Add extra space before merge points
                     if is_merge:
@@ -1110,8 +1625,10 @@ int main() {
                     
                     pos[i] = (x_center, y_level)
                     y_level -= y_spacing
-                    positioned.add(i)
+                    positioned[i] = 1
         
+        if structure_key is not None:
+            self._tta_layout_cache = (structure_key, pos)
         return pos
     
     def find_next_block(self, from_block, branch_type):
@@ -1157,16 +1674,14 @@ int main() {
                 if not any(filename.lower().endswith(ext) for ext in ['.png', '.pdf', '.jpg', '.jpeg']):
                     filename += '.png'
                 
-                # Create the graph again for saving
-                G = nx.DiGraph()
-                for var, deps in self.dataflow_analyzer.dependencies.items():
-                    G.add_node(var)
-                    for dep in deps:
-                        G.add_edge(dep, var)
+                # Reuse the displayed graph and layout for saving
+                G = self._build_dependency_graph()
                 
-                fig = plt.figure(figsize=(12, 8))
+                # A standalone Figure: no pyplot window is created just to render the file
+                fig = Figure(figsize=(12, 8))
+                ax = fig.add_subplot(111)
                 if G.nodes():
-                    pos = nx.spring_layout(G, k=2, iterations=50)
+                    pos = self._get_dependency_layout(G)
                     
                     # Different colors for pointer dereferences
                     node_colors = []
@@ -1176,15 +1691,21 @@ int main() {
                         else:
                             node_colors.append('lightblue')
                     
-                    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=2000, alpha=0.8)
-                    nx.draw_networkx_labels(G, pos, font_size=12, font_weight='bold')
-                    nx.draw_networkx_edges(G, pos, edge_color='gray', arrows=True, arrowsize=25)
-                    plt.title("Variable Dependency Graph\n(Blue: variables, Red: pointer dereferences)", fontsize=16, fontweight='bold')
+                    nx.draw_networkx_nodes(G, pos, node_color=node_colors, node_size=2000, alpha=0.8, ax=ax)
+                    labels = nx.draw_networkx_labels(G, pos, font_size=12, font_weight='bold', ax=ax)
+                    nx.draw_networkx_edges(G, pos, edge_color='gray', arrows=True, arrowsize=25, ax=ax)
+                    ax.set_title("Variable Dependency Graph\n(Blue: variables, Red: pointer dereferences)", fontsize=16, fontweight='bold')
+                    
+                    if rasterize_graph_data(filename, G.number_of_nodes() + G.number_of_edges()):
+                        # Nodes (zorder 2) and edges (zorder 1) are drawn into one image; the labels
+                        # are lifted above them so they stay text
+                        for label in labels.values():
+                            label.set_zorder(3)
+                        ax.set_rasterization_zorder(2.5)
                 
-                plt.axis('off')
-                plt.tight_layout()
-                plt.savefig(filename, dpi=300, bbox_inches='tight')
-                plt.close(fig)  # Properly close the figure
+                ax.axis('off')
+                fig.tight_layout()
+                fig.savefig(filename, bbox_inches='tight', **graph_save_options(filename, self.fast_export.get()))
                 
                 messagebox.showinfo("Success", f"Graph saved to {filename}")
                 
@@ -1214,37 +1735,38 @@ int main() {
                     filename += '.png'
                 
                 # Regenerate and save the TTA graph
-                self.tta_analyzer.save_graph_image(filename)
+                self.tta_analyzer.save_graph_image(filename, fast=self.fast_export.get())
                 messagebox.showinfo("Success", f"TTA Graph saved to {filename}")
                 
             except Exception as e:
                 messagebox.showerror("Save Error", f"Could not save TTA graph: {str(e)}")
     
-    def check_syntax_errors(self, code):
+    def _scan_c(self, code):
+        """Count unmatched brackets in code, skipping comments and literals.
+        
+        Returns the bracket counts and the line numbers of unterminated strings.
+        """
+        counts = dict.fromkeys('{}()[]', 0)
+        unterminated = []
+        for match in self._scan_re.finditer(code):
+            kind = match.lastgroup
+            if kind == 'bracket':
+                counts[match.group()] += 1
+            elif kind == 'string' and match.group('closed') is None:
+                unterminated.append(code.count('\n', 0, match.start()) + 1)
+        return counts, unterminated
+    
+    def check_syntax_errors(self, lines):
         """Basic syntax error checking for C code"""
         self.syntax_errors = []
-        lines = code.splitlines()
         
-        # Simple checks
-        brace_count = 0
-        paren_count = 0
-        bracket_count = 0
+        counts, unterminated = self._scan_c('\n'.join(lines))
+        for i in unterminated:
+            self.syntax_errors.append(f"Line {i}: Unterminated string")
         
-        for i, line in enumerate(lines, 1):
-            line_stripped = line.strip()
-            
-            # Skip comments and preprocessor
-            if line_stripped.startswith('//') or line_stripped.startswith('#'):
-                continue
-            
-            # Count braces, parentheses, brackets
-            brace_count += line.count('{') - line.count('}')
-            paren_count += line.count('(') - line.count(')')
-            bracket_count += line.count('[') - line.count(']')
-            
-            # Check for unterminated strings
-            if line.count('"') % 2 != 0:
-                self.syntax_errors.append(f"Line {i}: Unterminated string")
+        brace_count = counts['{'] - counts['}']
+        paren_count = counts['('] - counts[')']
+        bracket_count = counts['['] - counts[']']
         
         # Check unmatched brackets
         if brace_count != 0:
@@ -1255,11 +1777,10 @@ int main() {
             self.syntax_errors.append(f"Unmatched brackets: {abs(bracket_count)} extra")
         
         # Display results
-        self.error_text.delete('1.0', tk.END)
         if self.syntax_errors:
-            self.error_text.insert('1.0', '\n'.join(self.syntax_errors))
+            self._replace_text(self.error_text, '\n'.join(self.syntax_errors))
         else:
-            self.error_text.insert('1.0', "✓ No syntax errors detected!")
+            self._replace_text(self.error_text, "✓ No syntax errors detected!")
     
     def load_file(self):
         """Load a C file"""
@@ -1274,13 +1795,12 @@ int main() {
         
         if filename:
             try:
-                with open(filename, 'r', encoding='utf-8') as f:
-                    content = f.read()
+                content = Path(filename).read_text(encoding='utf-8')
                 
                 self.text_editor.delete('1.0', tk.END)
                 self.text_editor.insert('1.0', content)
                 self.update_line_numbers()
-                self.analyze_code()
+                self._analyze_in_background()
                 
                 self.status_bar.config(text=f"Loaded: {filename}")
                 
@@ -1314,6 +1834,64 @@ int main() {
             except Exception as e:
                 messagebox.showerror("Save Error", f"Failed to save file:\n{str(e)}")
     
+    def _export_in_background(self, task, success_message, status_text, error_message):
+        """Run an export's serialization and file write on the worker thread
+        
+        The export data is built on the Tk thread before this is called; the dialogs
+        reporting the result are shown on the Tk thread once the worker is done.
+        """
+        self.status_bar.config(text="Exporting...")
+        future = self._export_pool.submit(task)
+        self.root.after(50, self._poll_background_export, future, success_message, status_text, error_message)
+    
+    def _poll_background_export(self, future, success_message, status_text, error_message):
+        """Report a background export once it is done"""
+        if not future.done():
+            self.root.after(50, self._poll_background_export, future, success_message, status_text, error_message)
+            return
+        
+        try:
+            future.result()
+        except Exception as e:
+            print(f"Export error details: {e}")
+            messagebox.showerror("Export Error", f"{error_message}:\n{str(e)}")
+            return
+        messagebox.showinfo("Export Successful", success_message)
+        self.status_bar.config(text=status_text)
+    
+    def _ask_export_filename(self, title, initialfile, prompt_title, filetypes=(("JSON files", "*.json"),),
+                             extensions=('.json',)):
+        """Ask where to save an export and return (filename, compress), filename None if cancelled
+        
+        Adds the first extension if the name has none of them, and .gz when the Gzip
+        option is set. Names that already end in .gz are compressed as well.
+        """
+        filename = None
+        try:
+            filename = filedialog.asksaveasfilename(
+                title=title,
+                initialfile=initialfile,
+                filetypes=[*filetypes, ("All files", "*.*")]
+            )
+        except Exception as dialog_error:
+            print(f"File dialog error: {dialog_error}")
+            filename = simpledialog.askstring(prompt_title, "Enter filename (with .json extension):")
+        
+        if not filename:
+            return None, False
+        if not filename.lower().endswith(tuple(ext + gz for ext in extensions for gz in ('', '.gz'))):
+            filename += extensions[0]
+        compress = self.gzip_export.get() or filename.lower().endswith('.gz')
+        if compress and not filename.lower().endswith('.gz'):
+            filename += '.gz'
+        return filename, compress
+    
+    def _export_json(self, data, filename, compress, success_message, status_text, error_message):
+        """Write export data as JSON in the background, honouring the Compact JSON option"""
+        compact = self.compact_export.get()
+        self._export_in_background(lambda: write_json_file(filename, data, compact, compress),
+                                   success_message, status_text, error_message)
+    
     def export_analysis(self):
         """Export comprehensive dataflow analysis to JSON"""
         try:
@@ -1330,38 +1908,28 @@ int main() {
                         "words": len(code.split())
                     }
                 },
-                "syntax_errors": self.syntax_errors,
+                "syntax_errors": list(self.syntax_errors),
                 "dataflow_analysis": {}
             }
             
             if self.dataflow_analyzer:
+                # Snapshot the results - the export is written on a worker thread while edits
+                # may update the analyzer
+                analyzer = self.dataflow_analyzer
                 export_data["dataflow_analysis"] = {
-                    "variables": self.dataflow_analyzer.variables,
-                    "dependencies": self.dataflow_analyzer.dependencies,
-                    "line_analysis": self.dataflow_analyzer.line_analysis,
-                    "reaching_definitions": self.dataflow_analyzer.reaching_definitions
+                    "variables": {var: {'definitions': list(info['definitions']), 'uses': list(info['uses'])}
+                                  for var, info in analyzer.variables.items()},
+                    "dependencies": dict(analyzer.dependencies),
+                    "line_analysis": dict(analyzer.line_analysis),
+                    "reaching_definitions": dict(analyzer.reaching_definitions)
                 }
             
-            filename = None
-            try:
-                filename = filedialog.asksaveasfilename(
-                    title="Export Dataflow Analysis to JSON",
-                    initialfile="dataflow_analysis.json",
-                    filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-                )
-            except Exception as dialog_error:
-                print(f"File dialog error: {dialog_error}")
-                filename = simpledialog.askstring("Export Analysis", "Enter filename (with .json extension):")
-            
-            if filename and not filename.lower().endswith('.json'):
-                filename += '.json'
-            
+            filename, compress = self._ask_export_filename(
+                "Export Dataflow Analysis to JSON", "dataflow_analysis.json", "Export Analysis")
             if filename:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(export_data, f, indent=2, ensure_ascii=False)
-                
-                messagebox.showinfo("Export Successful", f"Dataflow analysis exported to:\n{filename}")
-                self.status_bar.config(text=f"Exported to {filename}")
+                self._export_json(export_data, filename, compress,
+                                  f"Dataflow analysis exported to:\n{filename}", f"Exported to {filename}",
+                                  "Failed to export analysis")
         
         except Exception as e:
             error_msg = f"Failed to export analysis:\n{str(e)}"
@@ -1375,30 +1943,27 @@ int main() {
             return
         
         try:
-            # Get the C-style linked list format
-            c_linked_list_data = self.dataflow_analyzer.export_c_linked_list_format()
-            
-            # Get filename
-            filename = None
-            try:
-                filename = filedialog.asksaveasfilename(
-                    title="Export C-Style Linked List Dataflow",
-                    initialfile="c_dataflow_linked_list.json",
-                    filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-                )
-            except Exception as dialog_error:
-                print(f"File dialog error: {dialog_error}")
-                filename = simpledialog.askstring("Export C-Style", "Enter filename (with .json extension):")
-            
-            if filename and not filename.lower().endswith('.json'):
-                filename += '.json'
-            
-            if filename:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(c_linked_list_data, f, indent=2, ensure_ascii=False)
-                
-                messagebox.showinfo("Export Successful", f"C-style linked list exported to:\n{filename}")
-                self.status_bar.config(text=f"C-style format exported to {filename}")
+            filename, compress = self._ask_export_filename(
+                "Export C-Style Linked List Dataflow", "c_dataflow_linked_list.json", "Export C-Style",
+                filetypes=(("JSON files", "*.json"), ("JSON Lines (streamed)", "*.jsonl")),
+                extensions=('.json', '.jsonl'))
+            if not filename:
+                return
+            
+            analyzer = self.dataflow_analyzer
+            success_message = f"C-style linked list exported to:\n{filename}"
+            status_text = f"C-style format exported to {filename}"
+            error_message = "Failed to export C-style analysis"
+            if filename.lower().endswith(('.jsonl', '.jsonl.gz')):
+                # Operations are streamed one per line instead of building the whole document
+                self._export_in_background(lambda: analyzer.write_c_linked_list_jsonl(filename, compress),
+                                           success_message, status_text, error_message)
+            else:
+                # Get the C-style linked list format (compact exports skip the C text)
+                c_linked_list_data = analyzer.export_c_linked_list_format(
+                    include_c_representation=not self.compact_export.get())
+                self._export_json(c_linked_list_data, filename, compress,
+                                  success_message, status_text, error_message)
         
         except Exception as e:
             error_msg = f"Failed to export C-style analysis:\n{str(e)}"
@@ -1411,30 +1976,15 @@ int main() {
             return
         
         try:
-            # Get the TTA graph format
-            tta_graph_data = self.tta_analyzer.export_tta_graph_format()
-            
-            # Get filename
-            filename = None
-            try:
-                filename = filedialog.asksaveasfilename(
-                    title="Export TTA Graph Analysis",
-                    initialfile="tta_graph_analysis.json",
-                    filetypes=[("JSON files", "*.json"), ("All files", "*.*")]
-                )
-            except Exception as dialog_error:
-                print(f"File dialog error: {dialog_error}")
-                filename = simpledialog.askstring("Export TTA", "Enter filename (with .json extension):")
-            
-            if filename and not filename.lower().endswith('.json'):
-                filename += '.json'
-            
+            filename, compress = self._ask_export_filename(
+                "Export TTA Graph Analysis", "tta_graph_analysis.json", "Export TTA")
             if filename:
-                with open(filename, 'w', encoding='utf-8') as f:
-                    json.dump(tta_graph_data, f, indent=2, ensure_ascii=False)
-                
-                messagebox.showinfo("Export Successful", f"TTA graph exported to:\n{filename}")
-                self.status_bar.config(text=f"TTA format exported to {filename}")
+                # The TTA graph is streamed to the file block by block instead of being built first
+                analyzer = self.tta_analyzer
+                compact = self.compact_export.get()
+                self._export_in_background(lambda: analyzer.write_tta_graph_json(filename, compact, compress),
+                                           f"TTA graph exported to:\n{filename}", f"TTA format exported to {filename}",
+                                           "Failed to export TTA analysis")
         
         except Exception as e:
             error_msg = f"Failed to export TTA analysis:\n{str(e)}"
@@ -1447,12 +1997,16 @@ int main() {
     def on_closing(self):
         """Handle proper application closing"""
         try:
-            # Clean up matplotlib canvas if it exists
-            if hasattr(self, 'current_canvas') and self.current_canvas:
-                self.current_canvas.get_tk_widget().destroy()
+            # Don't start analyses that are still queued, but let an export finish its file
+            self._analysis_pool.shutdown(wait=False)
+            self._export_pool.shutdown(wait=True)
             
-            # Close any matplotlib figures
-            plt.close('all')
+            # Clean up the per-panel figures and canvases. They are standalone Figures,
+            # not in pyplot's registry, so there is nothing for plt.close('all') to do.
+            for fig, canvas in self._graph_canvases.values():
+                canvas.get_tk_widget().destroy()
+                fig.clear()
+            self._graph_canvases.clear()
             
             # Destroy the tkinter window
             self.root.quit()
@@ -1464,12 +2018,60 @@ int main() {
             # Force exit to ensure command prompt returns
             sys.exit(0)
 
+# Dataflow analyzer patterns, compiled once instead of looked up per line
+_FUNC_DEF_RE = re.compile(r'\b(int|char|double|float|long|short|void)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*{')
+_DEREF_ASSIGN_RE = re.compile(r'\*\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=')
+_POINTER_TYPE_RE = re.compile(r'\b(int|char|double|float|long|short|void)\s*\*')
+_DECL_ASSIGN_RE = re.compile(r'\b(int|char|double|float|long|short|void)\s*\*?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=')
+_DECL_RE = re.compile(r'\b(int|char|double|float|long|short|void)\s*\*?\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:,|;)')
+_DECL_TYPE_RE = re.compile(r'\b(int|char|double|float|long|short|void)\s*(\*?)')
+_DECL_NAMES_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:[,;])')
+_ASSIGN_RE = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=')
+_ASSIGN_TARGET_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=')
+_CONTROL_RE = re.compile(r'\b(if|while|for)\s*\(')
+_CALL_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(')
+_CALL_ARGS_RE = re.compile(r'\b[a-zA-Z_][a-zA-Z0-9_]*\s*\(([^)]*)\)')
+_DEREF_RE = re.compile(r'\*\s*([a-zA-Z_][a-zA-Z0-9_]*)')
+_ARRAY_ACCESS_RE = re.compile(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\[([^\]]+)\]')
+_FIELD_ACCESS_RE = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\.[a-zA-Z_][a-zA-Z0-9_]*')
+_IDENT_RE = re.compile(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b')
+_STRING_LITERAL_RE = re.compile(r'"[^"]*"')
+_CHAR_LITERAL_RE = re.compile(r"'[^']*'")
+_INT_LITERAL_RE = re.compile(r'\b\d+\b')
+_FREE_CALL_RE = re.compile(r'free\s*\(\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\)')
+
+# Names that are never variables in an expression / in a call argument
+_EXPRESSION_KEYWORDS = frozenset({
+    'int', 'char', 'double', 'float', 'long', 'short', 'void', 'signed', 'unsigned',
+    'if', 'else', 'while', 'for', 'do', 'switch', 'case', 'default', 'break', 'continue',
+    'return', 'sizeof', 'typedef', 'struct', 'union', 'enum', 'static', 'extern', 'const',
+    'volatile', 'register', 'auto', 'inline', 'restrict', 'NULL'
+})
+_ARGUMENT_KEYWORDS = frozenset({'int', 'char', 'double', 'float', 'NULL', 'sizeof'})
+
+# Static part of the C linked list export - shared, never modified
+C_LINKED_LIST_TYPE_DEFINITIONS = {
+    "operation_types": {
+        "WRITE": "Variable definition or assignment",
+        "READ": "Variable usage or reference",
+        "KILL": "Variable goes out of scope, is redefined, or explicitly freed"
+    },
+    "operation_element": {
+        "operation_id": "int",
+        "variable_name": "string",
+        "operation": "operation_types",
+        "line_number": "int",
+        "details": "string",
+        "next": "int* (pointer to next operation_id, NULL if last)"
+    }
+}
+
 class DataflowAnalyzer:
     """Comprehensive dataflow analyzer for C code"""
     
-    def __init__(self, code):
+    def __init__(self, code, lines=None):
         self.code = code
-        self.lines = code.splitlines()
+        self.lines = lines if lines is not None else code.splitlines()
         
         # Analysis results
         self.variables = {}  # {var_name: {'definitions': [(line, details)], 'uses': [(line, details)]}}
@@ -1477,8 +2079,18 @@ class DataflowAnalyzer:
         self.line_analysis = {}  # {line_num: {'reads': [], 'writes': [], 'operation': ''}}
         self.reaching_definitions = {}  # {line_num: [list of lines that can reach this line]}
         
+        # Compiled whole-word patterns used by the editor highlighter
+        self._var_word_re_cache = {}  # {var_name: re.Pattern}
+        
+        # Per-line definition/use events, replayed to rebuild self.variables
+        self._line_events = {}  # {line_num: [(kind, var_name, details)]}
+        
+        # Operation sequence shared by the linked list display, the TTA blocks and the export
+        self._operations = None
+    
     def analyze(self):
         """Perform comprehensive dataflow analysis"""
+        self._operations = None
         self.analyze_variables()
         self.build_dependencies()
         self.compute_reaching_definitions()
@@ -1486,142 +2098,151 @@ class DataflowAnalyzer:
     def analyze_variables(self):
         """Analyze variable definitions and uses"""
         for i, line in enumerate(self.lines, 1):
-            line_stripped = line.strip()
-            
-            # Initialize tracking for this line
-            reads = []
-            writes = []
-            operation = ""
-            
-            # Skip empty lines, comments, and preprocessor
-            if not line_stripped or line_stripped.startswith('//') or line_stripped.startswith('#'):
-                continue
-            
-            # Skip function definition lines (they have different scoping rules)
-            if re.search(r'\b(int|char|double|float|long|short|void)\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)\s*{', line):
-                operation = "Function definition"
-                continue
-            
-            # IMPORTANT: Check pointer dereference assignments FIRST (*ptr = value)
-            if (re.search(r'\*\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line) and 
-                not re.search(r'==', line) and 
-                not re.search(r'\b(int|char|double|float|long|short|void)\s*\*', line)):
-                deref_match = re.search(r'\*\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line)
-                if deref_match:
-                    ptr_name = deref_match.group(1)
-                    deref_name = f"*{ptr_name}"  # Track as pseudo-variable
-                    operation = f"Pointer dereference assignment: *{ptr_name} = value"
-                    
-                    # The pointer itself is USED (read from)
-                    reads.append(ptr_name)
-                    
-                    # Track the dereference as a write
-                    writes.append(deref_name)
-                    self.add_variable_definition(deref_name, i, operation)
-                    
-                    # Find what's being assigned to the dereferenced pointer
-                    assignment_part = line.split('=', 1)[1] if '=' in line else ""
-                    reads.extend(self.extract_variables_from_expression(assignment_part))
-            
-            # Variable declarations/definitions (including pointer declarations)
-            elif re.search(r'\b(int|char|double|float|long|short|void)\s*\*?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line):
-                decl_match = re.search(r'\b(int|char|double|float|long|short|void)\s*\*?\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line)
-                if decl_match:
-                    var_name = decl_match.group(2)
-                    writes.append(var_name)
-                    operation = f"Declaration and assignment of {var_name}"
-                    self.add_variable_definition(var_name, i, operation)
-                    
-                    # Find what it's assigned from
-                    assignment_part = line.split('=', 1)[1] if '=' in line else ""
-                    reads.extend(self.extract_variables_from_expression(assignment_part))
-            
-            # Variable declarations without initialization (must come after assignments)
-            elif re.search(r'\b(int|char|double|float|long|short|void)\s*\*?\s+([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:,|;)', line):
-                # Handle multiple declarations on one line
-                type_match = re.search(r'\b(int|char|double|float|long|short|void)\s*(\*?)', line)
-                if type_match:
-                    var_type = type_match.group(1)
-                    is_pointer = type_match.group(2) == '*'
-                    
-                    # Find all variable names after the type
-                    remaining = line[type_match.end():]
-                    var_names = re.findall(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*(?:[,;])', remaining)
-                    
-                    for var_name in var_names:
-                        if var_name not in writes:  # Avoid duplicates
-                            writes.append(var_name)
-                            ptr_str = " pointer" if is_pointer else ""
-                            operation = f"Declaration of {var_name}{ptr_str}"
-                            self.add_variable_definition(var_name, i, operation)
-            
-            # Regular assignment operations (var = value)
-            elif re.search(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line) and not re.search(r'==', line) and not re.search(r'\*', line):
-                assignment_match = re.search(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line)
-                if assignment_match:
-                    var_name = assignment_match.group(1)
-                    writes.append(var_name)
-                    operation = f"Assignment to {var_name}"
-                    self.add_variable_definition(var_name, i, operation)
-                    
-                    # Find what it's assigned from
-                    assignment_part = line.split('=', 1)[1] if '=' in line else ""
-                    reads.extend(self.extract_variables_from_expression(assignment_part))
-            
-            # Control flow statements (CHECK FIRST before function calls!)
-            elif re.search(r'\b(if|while|for)\s*\(', line):
-                control_match = re.search(r'\b(if|while|for)\s*\(', line)
-                if control_match:
-                    control_type = control_match.group(1)
-                    operation = f"Control flow: {control_type} statement"
-                    
-                    # Extract variables from condition
-                    paren_start = line.find('(')
-                    paren_end = line.find(')')
-                    if paren_start != -1 and paren_end != -1:
-                        condition = line[paren_start+1:paren_end]
-                        reads.extend(self.extract_variables_from_expression(condition))
-            
-            # Function calls (like printf, scanf, malloc, etc.) - CHECK AFTER control flow
-            elif re.search(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(', line):
-                func_match = re.search(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\(', line)
-                if func_match:
-                    func_name = func_match.group(1)
-                    operation = f"Function call: {func_name}()"
+            self.analyze_line(i, line)
+    
+    def analyze_line(self, i, line):
+        """Analyze variable definitions and uses on a single line"""
+        line_stripped = line.strip()
+        
+        # Initialize tracking for this line
+        reads = []
+        writes = []
+        operation = ""
+        
+        # Skip empty lines, comments, and preprocessor
+        if not line_stripped or line_stripped.startswith(('//', '#')):
+            return
+        
+        # Most patterns below need an '=' or a '(' - lines without one skip those searches
+        eq_pos = line.find('=')
+        has_assign = eq_pos != -1
+        has_call = '(' in line
+        
+        # Skip function definition lines (they have different scoping rules)
+        if has_call and '{' in line and _FUNC_DEF_RE.search(line):
+            operation = "Function definition"
+            return
+        
+        # IMPORTANT: Check pointer dereference assignments FIRST (*ptr = value)
+        if (has_assign and _DEREF_ASSIGN_RE.search(line) and
+            '==' not in line and
+            not _POINTER_TYPE_RE.search(line)):
+            deref_match = _DEREF_ASSIGN_RE.search(line)
+            if deref_match:
+                ptr_name = deref_match.group(1)
+                deref_name = f"*{ptr_name}"  # Track as pseudo-variable
+                operation = f"Pointer dereference assignment: *{ptr_name} = value"
+                
+                # The pointer itself is USED (read from)
+                reads.append(ptr_name)
+                
+                # Track the dereference as a write
+                writes.append(deref_name)
+                self.add_variable_definition(deref_name, i, operation)
+                
+                # Find what's being assigned to the dereferenced pointer
+                assignment_part = line[eq_pos + 1:]
+                reads.extend(self.extract_variables_from_expression(assignment_part))
+        
+        # Variable declarations/definitions (including pointer declarations)
+        elif has_assign and _DECL_ASSIGN_RE.search(line):
+            decl_match = _DECL_ASSIGN_RE.search(line)
+            if decl_match:
+                var_name = decl_match.group(2)
+                writes.append(var_name)
+                operation = f"Declaration and assignment of {var_name}"
+                self.add_variable_definition(var_name, i, operation)
+                
+                # Find what it's assigned from
+                assignment_part = line[eq_pos + 1:]
+                reads.extend(self.extract_variables_from_expression(assignment_part))
+        
+        # Variable declarations without initialization (must come after assignments)
+        elif _DECL_RE.search(line):
+            # Handle multiple declarations on one line
+            type_match = _DECL_TYPE_RE.search(line)
+            if type_match:
+                var_type = type_match.group(1)
+                is_pointer = type_match.group(2) == '*'
+                
+                # Find all variable names after the type
+                remaining = line[type_match.end():]
+                var_names = _DECL_NAMES_RE.findall(remaining)
+                
+                for var_name in var_names:
+                    if var_name not in writes:  # Avoid duplicates
+                        writes.append(var_name)
+                        ptr_str = " pointer" if is_pointer else ""
+                        operation = f"Declaration of {var_name}{ptr_str}"
+                        self.add_variable_definition(var_name, i, operation)
+        
+        # Regular assignment operations (var = value)
+        elif has_assign and '==' not in line and '*' not in line and _ASSIGN_RE.search(line):
+            assignment_match = _ASSIGN_RE.search(line)
+            if assignment_match:
+                var_name = assignment_match.group(1)
+                writes.append(var_name)
+                operation = f"Assignment to {var_name}"
+                self.add_variable_definition(var_name, i, operation)
+                
+                # Find what it's assigned from
+                assignment_part = line[eq_pos + 1:]
+                reads.extend(self.extract_variables_from_expression(assignment_part))
+        
+        # Control flow statements (CHECK FIRST before function calls!)
+        elif has_call and _CONTROL_RE.search(line):
+            control_match = _CONTROL_RE.search(line)
+            if control_match:
+                control_type = control_match.group(1)
+                operation = f"Control flow: {control_type} statement"
+                
+                # Extract variables from condition
+                paren_start = line.find('(')
+                paren_end = line.find(')')
+                if paren_start != -1 and paren_end != -1:
+                    condition = line[paren_start+1:paren_end]
+                    reads.extend(self.extract_variables_from_expression(condition))
+        
+        # Function calls (like printf, scanf, malloc, etc.) - CHECK AFTER control flow
+        elif has_call and _CALL_RE.search(line):
+            func_match = _CALL_RE.search(line)
+            if func_match:
+                func_name = func_match.group(1)
+                operation = f"Function call: {func_name}()"
+                
+                # Extract variables used in function arguments
+                paren_start = line.find('(')
+                paren_end = line.rfind(')')
+                if paren_start != -1 and paren_end != -1:
+                    args = line[paren_start+1:paren_end]
+                    reads.extend(self.extract_variables_from_expression(args))
                     
-                    # Extract variables used in function arguments
-                    paren_start = line.find('(')
-                    paren_end = line.rfind(')')
-                    if paren_start != -1 and paren_end != -1:
-                        args = line[paren_start+1:paren_end]
-                        reads.extend(self.extract_variables_from_expression(args))
-                        
-                    # Special handling for memory allocation functions
-                    if func_name in ['malloc', 'calloc', 'realloc'] and '=' in line:
-                        # This is an assignment from malloc
-                        assign_match = re.search(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*=', line[:paren_start])
-                        if assign_match and assign_match.group(1) not in writes:
-                            ptr_var = assign_match.group(1)
-                            writes.append(ptr_var)
-                            operation = f"Memory allocation: {ptr_var} = {func_name}(...)"
-                            self.add_variable_definition(ptr_var, i, operation)
-            
-            # Return statements
-            elif 'return' in line:
-                operation = "Return statement"
-                return_part = line.split('return', 1)[1] if 'return' in line else ""
-                reads.extend(self.extract_variables_from_expression(return_part))
-            
-            # Add uses for all read variables
-            for var in reads:
-                self.add_variable_use(var, i, f"Used in: {operation}")
-            
-            # Store line analysis
-            self.line_analysis[i] = {
-                'reads': list(set(reads)),
-                'writes': list(set(writes)),
-                'operation': operation
-            }
+                # Special handling for memory allocation functions
+                if func_name in ['malloc', 'calloc', 'realloc'] and '=' in line:
+                    # This is an assignment from malloc
+                    assign_match = _ASSIGN_TARGET_RE.search(line[:paren_start])
+                    if assign_match and assign_match.group(1) not in writes:
+                        ptr_var = assign_match.group(1)
+                        writes.append(ptr_var)
+                        operation = f"Memory allocation: {ptr_var} = {func_name}(...)"
+                        self.add_variable_definition(ptr_var, i, operation)
+        
+        # Return statements
+        elif 'return' in line:
+            operation = "Return statement"
+            return_part = line.split('return', 1)[1] if 'return' in line else ""
+            reads.extend(self.extract_variables_from_expression(return_part))
+        
+        # Add uses for all read variables
+        for var in reads:
+            self.add_variable_use(var, i, f"Used in: {operation}")
+        
+        # Store line analysis (names interned, like the ones in self.variables)
+        self.line_analysis[i] = {
+            'reads': list(dict.fromkeys(map(sys.intern, reads))),
+            'writes': list(dict.fromkeys(map(sys.intern, writes))),
+            'operation': operation
+        }
     
     def extract_variables_from_expression(self, expression):
         """Extract variable names from a C expression"""
@@ -1636,16 +2257,17 @@ class DataflowAnalyzer:
             expression = expression[:comment_pos]
         
         # Handle pointer dereferences (*ptr) as reads
-        deref_matches = re.finditer(r'\*\s*([a-zA-Z_][a-zA-Z0-9_]*)', expression)
-        for match in deref_matches:
-            ptr_name = match.group(1)
-            # Add both the pointer (being read) and the dereferenced value
-            variables.append(ptr_name)
-            variables.append(f"*{ptr_name}")
+        if '*' in expression:
+            deref_matches = _DEREF_RE.finditer(expression)
+            for match in deref_matches:
+                ptr_name = match.group(1)
+                # Add both the pointer (being read) and the dereferenced value
+                variables.append(ptr_name)
+                variables.append(f"*{ptr_name}")
         
         # Extract variables from function call arguments FIRST
         try:
-            func_calls = re.finditer(r'\b[a-zA-Z_][a-zA-Z0-9_]*\s*\(([^)]*)\)', expression)
+            func_calls = _CALL_ARGS_RE.finditer(expression) if '(' in expression else ()
             for call in func_calls:
                 args = call.group(1).strip()
                 if args:
@@ -1654,125 +2276,208 @@ class DataflowAnalyzer:
                         if arg and not arg.isdigit():
                             # Check for pointer dereferences in arguments
                             if '*' in arg:
-                                deref_match = re.search(r'\*\s*([a-zA-Z_][a-zA-Z0-9_]*)', arg)
+                                deref_match = _DEREF_RE.search(arg)
                                 if deref_match:
                                     ptr_name = deref_match.group(1)
                                     variables.append(ptr_name)
                                     variables.append(f"*{ptr_name}")
-                            arg_vars = re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', arg)
+                            arg_vars = _IDENT_RE.findall(arg)
                             for var in arg_vars:
-                                if var not in ['int', 'char', 'double', 'float', 'NULL', 'sizeof']:
+                                if var not in _ARGUMENT_KEYWORDS:
                                     variables.append(var)
         except Exception as e:
             pass
         
         # Filter out C keywords
-        c_keywords = {
-            'int', 'char', 'double', 'float', 'long', 'short', 'void', 'signed', 'unsigned',
-            'if', 'else', 'while', 'for', 'do', 'switch', 'case', 'default', 'break', 'continue',
-            'return', 'sizeof', 'typedef', 'struct', 'union', 'enum', 'static', 'extern', 'const',
-            'volatile', 'register', 'auto', 'inline', 'restrict', 'NULL'
-        }
+        c_keywords = _EXPRESSION_KEYWORDS
         
         # Handle array accesses (arr[i])
-        array_matches = re.finditer(r'([a-zA-Z_][a-zA-Z0-9_]*)\s*\[([^\]]+)\]', expression)
+        array_matches = _ARRAY_ACCESS_RE.finditer(expression) if '[' in expression else ()
         for match in array_matches:
             arr_name = match.group(1)
             index_expr = match.group(2)
             # Add the array variable
             variables.append(arr_name)
             # Extract variables from the index expression
-            index_vars = re.findall(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b', index_expr)
+            index_vars = _IDENT_RE.findall(index_expr)
             for var in index_vars:
                 if var not in c_keywords and len(var) > 0:
                     variables.append(var)
         
-        # Remove function calls, string literals, and numbers
-        cleaned = re.sub(r'"[^"]*"', '', expression)
-        cleaned = re.sub(r"'[^']*'", '', cleaned)
-        cleaned = re.sub(r'\b\d+\b', '', cleaned)
-        cleaned = re.sub(r'\b[a-zA-Z_][a-zA-Z0-9_]*\s*\([^)]*\)', '', cleaned)
+        # Remove function calls, string literals, and numbers. Each pattern needs a
+        # specific character, so substitutions that cannot match are skipped.
+        cleaned = expression
+        if '"' in cleaned:
+            cleaned = _STRING_LITERAL_RE.sub('', cleaned)
+        if "'" in cleaned:
+            cleaned = _CHAR_LITERAL_RE.sub('', cleaned)
+        cleaned = _INT_LITERAL_RE.sub('', cleaned)
+        if '(' in cleaned:
+            cleaned = _CALL_ARGS_RE.sub('', cleaned)
         
         # Remove pointer dereferences we already handled
-        cleaned = re.sub(r'\*\s*[a-zA-Z_][a-zA-Z0-9_]*', '', cleaned)
+        if '*' in cleaned:
+            cleaned = _DEREF_RE.sub('', cleaned)
         
         # Remove array accesses from cleaned expression to avoid double-counting
-        cleaned = re.sub(r'[a-zA-Z_][a-zA-Z0-9_]*\s*\[[^\]]+\]', '', cleaned)
+        if '[' in cleaned:
+            cleaned = _ARRAY_ACCESS_RE.sub('', cleaned)
         
         # Handle struct field access: p.x -> only extract 'p'
-        try:
-            cleaned = re.sub(r'\b([a-zA-Z_][a-zA-Z0-9_]*)\.[a-zA-Z_][a-zA-Z0-9_]*', r'\1 ', cleaned)
-        except Exception as e:
-            pass
+        if '.' in cleaned:
+            cleaned = _FIELD_ACCESS_RE.sub(r'\1 ', cleaned)
         
         # Find variable names normally
-        var_pattern = r'\b([a-zA-Z_][a-zA-Z0-9_]*)\b'
-        matches = re.findall(var_pattern, cleaned)
+        matches = _IDENT_RE.findall(cleaned)
         
         for match in matches:
             if match not in c_keywords and len(match) > 0:
                 variables.append(match)
         
-        return list(set(variables))
+        return list(dict.fromkeys(variables))  # dedup, keeping first-seen order
+    
+    def get_word_pattern(self, var_name):
+        """Return a cached whole-word regex for a variable name
+        
+        Lookarounds are used instead of \\b so names starting with '*' (pointer
+        dereferences) are matched too.
+        """
+        pattern = self._var_word_re_cache.get(var_name)
+        if pattern is None:
+            pattern = re.compile(r'(?<![A-Za-z0-9_])' + re.escape(var_name) + r'(?![A-Za-z0-9_])')
+            self._var_word_re_cache[var_name] = pattern
+        return pattern
     
     def add_variable_definition(self, var_name, line_num, details):
         """Add a variable definition"""
+        var_name = sys.intern(var_name)  # One shared str per name across all results
         if var_name not in self.variables:
             self.variables[var_name] = {'definitions': [], 'uses': []}
         
         self.variables[var_name]['definitions'].append((line_num, details))
+        self._line_events.setdefault(line_num, []).append(('definitions', var_name, details))
     
     def add_variable_use(self, var_name, line_num, details):
         """Add a variable use"""
+        var_name = sys.intern(var_name)
         if var_name not in self.variables:
             self.variables[var_name] = {'definitions': [], 'uses': []}
         
         self.variables[var_name]['uses'].append((line_num, details))
+        self._line_events.setdefault(line_num, []).append(('uses', var_name, details))
+    
+    def reanalyze_lines(self, code, line_numbers, lines=None):
+        """Re-run the per-line analysis for the given lines only.
+        
+        The line count must be unchanged since the last analysis; the other
+        lines keep their previous results.
+        """
+        self.code = code
+        self.lines = lines if lines is not None else code.splitlines()
+        
+        # Patch a copy - a background export may still be reading the current dicts. analyze_line
+        # also adds to self.variables, which is rebuilt from the line events below
+        self.line_analysis = dict(self.line_analysis)
+        self.variables = {}
+        for line_num in line_numbers:
+            self.line_analysis.pop(line_num, None)
+            self._line_events.pop(line_num, None)
+            if line_num <= len(self.lines):
+                self.analyze_line(line_num, self.lines[line_num - 1])
+        
+        self.line_analysis = dict(sorted(self.line_analysis.items()))
+        self._operations = None
+        self._rebuild_variables()
+        
+        self.dependencies = {}
+        self.reaching_definitions = {}
+        self.build_dependencies()
+        self.compute_reaching_definitions()
+    
+    def line_events(self, line_num):
+        """Return the (kind, var_name, details) definition/use events recorded for a line"""
+        return self._line_events.get(line_num, ())
+    
+    def _rebuild_variables(self):
+        """Rebuild self.variables from the recorded per-line events"""
+        self.variables = {}
+        for line_num in sorted(self._line_events):
+            for kind, var_name, details in self._line_events[line_num]:
+                if var_name not in self.variables:
+                    self.variables[var_name] = {'definitions': [], 'uses': []}
+                self.variables[var_name][kind].append((line_num, details))
     
     def build_dependencies(self):
         """Build variable dependency graph"""
+        # Names are interned, so the set and dict lookups below hash each name only once
+        listed = {}  # {written var: set of read vars already in its dependency list}
+        
         for line_num, analysis in self.line_analysis.items():
+            reads = analysis['reads']
             for written_var in analysis['writes']:
-                if written_var not in self.dependencies:
-                    self.dependencies[written_var] = []
+                deps = self.dependencies.setdefault(written_var, [])
+                if written_var not in listed:
+                    listed[written_var] = set(deps)
+                seen = listed[written_var]
                 
                 # Add dependencies on all read variables
-                for read_var in analysis['reads']:
-                    if read_var != written_var and read_var not in self.dependencies[written_var]:
-                        self.dependencies[written_var].append(read_var)
+                for read_var in reads:
+                    if read_var != written_var and read_var not in seen:
+                        seen.add(read_var)
+                        deps.append(read_var)
     
     def compute_reaching_definitions(self):
-        """Compute which definitions can reach each line"""
-        for line_num in self.line_analysis.keys():
-            reaching = []
-            
-            # For each variable used at this line
-            analysis = self.line_analysis[line_num]
-            for read_var in analysis['reads']:
-                if read_var in self.variables:
-                    # Find the latest definition before this line
-                    latest_def = None
-                    for def_line, details in self.variables[read_var]['definitions']:
-                        if def_line < line_num:
-                            if latest_def is None or def_line > latest_def:
-                                latest_def = def_line
-                    
+        """Compute which definitions can reach each line
+        
+        Lines are treated as straight-line code, so a single forward pass is the fixed
+        point: each line's definitions kill the earlier ones of the same variable.
+        """
+        gen = defaultdict(set)  # {line_num: variables defined on that line}
+        for var_name, var_info in self.variables.items():
+            for def_line, details in var_info['definitions']:
+                gen[def_line].add(var_name)
+        
+        live = {}  # {var_name: line of its latest definition so far}
+        for line_num in sorted(gen.keys() | self.line_analysis.keys()):
+            analysis = self.line_analysis.get(line_num)
+            if analysis is not None:
+                reaching = []
+                
+                # For each variable used at this line
+                for read_var in analysis['reads']:
+                    latest_def = live.get(read_var)
                     if latest_def:
                         reaching.append(f"Line {latest_def} (defines {read_var})")
+                
+                self.reaching_definitions[line_num] = reaching
             
-            self.reaching_definitions[line_num] = reaching
+            # OUT = gen | (IN - kill)
+            for var_name in gen.get(line_num, ()):
+                live[var_name] = line_num
     
     def build_operation_sequence(self):
-        """Build a sequence of operations in C linked list format"""
-        operations = []
+        """Build a sequence of operations in C linked list format
+        
+        Built once per analysis; callers share the list and must not modify it.
+        """
+        if self._operations is None:
+            self._operations = list(self.iter_operations())
+        return self._operations
+    
+    def iter_operations(self):
+        """Yield the operations of build_operation_sequence one at a time
+        
+        Each operation is held back until the next one exists, so the last one
+        can be yielded with next = None.
+        """
+        pending = None  # the latest operation, not yet yielded
         operation_id = 0
         
         # Track variable scopes and last definitions for KILL detection
         variable_definitions = {}  # var_name -> line_num of last definition
         
-        # Process lines in order to build operation sequence
-        for line_num in sorted(self.line_analysis.keys()):
-            analysis = self.line_analysis[line_num]
+        # Process lines in order to build operation sequence (line_analysis is kept in line order)
+        for line_num, analysis in self.line_analysis.items():
             
             # Process WRITE operations first
             for var in analysis['writes']:
@@ -1787,7 +2492,9 @@ class DataflowAnalyzer:
                         "details": f"Variable '{var}' redefined, killing previous definition from line {variable_definitions[var]}",
                         "next": operation_id + 1
                     }
-                    operations.append(kill_op)
+                    if pending is not None:
+                        yield pending
+                    pending = kill_op
                     operation_id += 1
                 
                 # Add WRITE operation
@@ -1799,7 +2506,9 @@ class DataflowAnalyzer:
                     "details": analysis['operation'],
                     "next": operation_id + 1
                 }
-                operations.append(write_op)
+                if pending is not None:
+                    yield pending
+                pending = write_op
                 variable_definitions[var] = line_num
                 operation_id += 1
             
@@ -1813,13 +2522,15 @@ class DataflowAnalyzer:
                     "details": analysis['operation'],
                     "next": operation_id + 1
                 }
-                operations.append(read_op)
+                if pending is not None:
+                    yield pending
+                pending = read_op
                 operation_id += 1
             
             # Check for explicit KILL operations (free, end of scope, etc.)
             if line_num <= len(self.lines) and 'free(' in self.lines[line_num - 1]:
                 # Extract variable being freed
-                free_match = re.search(r'free\s*\(\s*([a-zA-Z_][a-zA-Z0-9_]*)\s*\)', self.lines[line_num - 1])
+                free_match = _FREE_CALL_RE.search(self.lines[line_num - 1])
                 if free_match:
                     freed_var = free_match.group(1)
                     kill_op = {
@@ -1830,17 +2541,22 @@ class DataflowAnalyzer:
                         "details": f"Memory freed for variable '{freed_var}'",
                         "next": operation_id + 1
                     }
-                    operations.append(kill_op)
+                    if pending is not None:
+                        yield pending
+                    pending = kill_op
                     operation_id += 1
         
         # Update the next pointers - last operation should point to None
-        if operations:
-            operations[-1]["next"] = None
-        
-        return operations
+        if pending is not None:
+            pending["next"] = None
+            yield pending
 
-    def export_c_linked_list_format(self):
-        """Export dataflow analysis in C linked list format"""
+    def export_c_linked_list_format(self, include_c_representation=True):
+        """Export dataflow analysis in C linked list format
+        
+        The c_style_representation text repeats every operation as C source and is
+        left out when include_c_representation is False.
+        """
         operations = self.build_operation_sequence()
         
         # Build the C-style linked list JSON structure
@@ -1854,26 +2570,39 @@ class DataflowAnalyzer:
                 "timestamp": datetime.datetime.now().isoformat(),
                 "c_dataflow_version": "2.1"
             },
-            "type_definitions": {
-                "operation_types": {
-                    "WRITE": "Variable definition or assignment",
-                    "READ": "Variable usage or reference", 
-                    "KILL": "Variable goes out of scope, is redefined, or explicitly freed"
-                },
-                "operation_element": {
-                    "operation_id": "int",
-                    "variable_name": "string",
-                    "operation": "operation_types",
-                    "line_number": "int",
-                    "details": "string",
-                    "next": "int* (pointer to next operation_id, NULL if last)"
-                }
-            },
-            "linked_list_data": operations,
-            "c_style_representation": self.generate_c_style_output(operations)
+            "type_definitions": C_LINKED_LIST_TYPE_DEFINITIONS,
+            "linked_list_data": operations
         }
+        if include_c_representation:
+            c_linked_list["c_style_representation"] = self.generate_c_style_output(operations)
         
         return c_linked_list
+    
+    def write_c_linked_list_jsonl(self, filename, compress=False):
+        """Stream the linked list to filename as JSON Lines, gzipped if compress is set
+        
+        The first line is a metadata record, followed by one operation per line.
+        Operations are written as they are generated, so the list is never held in memory.
+        """
+        header = {
+            "metadata": {
+                "structure_type": "C_LINKED_LIST",
+                "node_type": "operation_element",
+                "operation_types": ["WRITE", "READ", "KILL"],
+                "format": "JSON_LINES",
+                "timestamp": datetime.datetime.now().isoformat(),
+                "c_dataflow_version": "2.1"
+            }
+        }
+        # One small write per operation - a 1 MiB buffer keeps the syscalls few
+        if compress:
+            f = gzip.open(filename, 'wb', compresslevel=1)
+        else:
+            f = open(filename, 'wb', buffering=1 << 20)
+        with f:
+            f.write(dumps_json(header, indent=None) + b'\n')
+            for op in self.iter_operations():
+                f.write(dumps_json(op, indent=None) + b'\n')
 
     def generate_c_style_output(self, operations):
         """Generate what this would look like in actual C code"""
@@ -1908,126 +2637,139 @@ class DataflowAnalyzer:
             next_id = op['next']
             next_str = f"&node_{next_id}" if next_id is not None else "NULL"
             
-            c_code_lines.extend([
-                f"// Node {i}:",
-                f"// operation_element node_{i} = {{",
-                f"//     .operation_id = {op['operation_id']},",
-                f"//     .variable_name = \"{var_name}\",",
-                f"//     .operation = {op_type},",
-                f"//     .line_number = {line_num},",
-                f"//     .details = \"{op['details']}\",",
-                f"//     .next = {next_str}",
-                f"// }};",
-                ""
-            ])
+            # One string per node (its trailing newline leaves the blank separator line)
+            c_code_lines.append(
+                f"// Node {i}:\n"
+                f"// operation_element node_{i} = {{\n"
+                f"//     .operation_id = {op['operation_id']},\n"
+                f"//     .variable_name = \"{var_name}\",\n"
+                f"//     .operation = {op_type},\n"
+                f"//     .line_number = {line_num},\n"
+                f"//     .details = \"{op['details']}\",\n"
+                f"//     .next = {next_str}\n"
+                f"// }};\n"
+            )
         
         return "\n".join(c_code_lines)
 
+# Block classification patterns of the TTA analyzer, compiled once
+_MAIN_DEF_RE = re.compile(r'\b(?:int|char|double|float|long|short|void)\s+main\s*\(')
+_LOOP_RE = re.compile(r'\b(?:for|while)\s*\(')
+_IF_RE = re.compile(r'\bif\s*\(')
+_ELSE_RE = re.compile(r'\belse\b')
+_CONTROL_KEYWORD_RE = re.compile(r'\b(?:if|for|while|else|return)\b')
+_BLOCK_KEYWORD_RE = re.compile(r'main|for|while|if|else')  # substrings, a superset of the four above
+_BRACE_OWNER_RE = re.compile(r'\b(?:if|for|while|else)\b')
+
 class TTAGraphAnalyzer:
     """TTA (Timed Task Automaton) Graph analyzer for C code blocks with improved block cutting"""
     
-    def __init__(self, code, dataflow_analyzer):
+    def __init__(self, code, dataflow_analyzer, lines=None):
         self.code = code
-        self.lines = code.splitlines()
+        self.lines = lines if lines is not None else code.splitlines()
         self.dataflow_analyzer = dataflow_analyzer
         
         # TTA Analysis results
         self.blocks = []  # List of block dictionaries
+        self.node_types = []  # node_type of each block, parallel to self.blocks
+        self.block_closes = bytearray()  # 1 if the block has a line with '}', parallel to self.blocks
+        self.block_has_else = bytearray()  # 1 if the block has a line with 'else', parallel to self.blocks
         self.arcs = []    # List of arc dictionaries
         self.control_flow_stack = []  # Stack to track nested control structures
+        self._reset_block_caches()
         
-    def analyze(self):
-        """Perform comprehensive TTA block analysis"""
+    def analyze(self, previous=None):
+        """Perform comprehensive TTA block analysis
+        
+        If a previous analyzer is given and its blocks have the same control
+        structure, its arcs are reused instead of being recomputed.
+        """
         self.create_logical_blocks()
-        self.create_control_flow_arcs()
+        if previous is not None and previous.structure_key() == self.structure_key():
+            self.arcs = [dict(arc) for arc in previous.arcs]
+            self._save_layout = previous._save_layout  # placed from the same structure
+        else:
+            self.create_control_flow_arcs()
         self.assign_operation_sequences()
     
+    def structure_key(self):
+        """Return the block properties that control flow arcs depend on"""
+        return tuple(
+            (node_type, bool(has_else), bool(closes))
+            for node_type, has_else, closes in zip(self.node_types, self.block_has_else, self.block_closes)
+        )
+    
+    def _reset_block_caches(self):
+        """Forget the per-block answers of the arc helpers - they only hold for the current blocks"""
+        self._branch_cache = {}     # {block_idx: bool}
+        self._merge_cache = {}      # {block_idx: block_idx or None}
+        self._xor_cache = {}        # {block_idx: [block_idx, ...]}
+        self._loop_exit_cache = {}  # {block_idx: block_idx or None}
+        self._loop_end_cache = {}   # {block_idx: block_idx or None}
+        self._save_layout = None    # (n, 2) array from _create_save_layout
+    
     def create_logical_blocks(self):
         """Create logical blocks based on control flow structure with improved block cutting"""
         self.blocks = []
+        self.node_types = []
+        self.block_closes = bytearray()
+        self.block_has_else = bytearray()
+        self._reset_block_caches()
         block_id = 0
         
-        # Track control flow structures
-        control_structures = []  # [(type, start_line, end_line)]
-        brace_stack = []  # Track opening braces to find matching closing braces
+        # Every pass below looks at the stripped lines - strip each one once
+        stripped = [line.strip() for line in self.lines]
         
-        # First pass: identify control flow structures and their boundaries
-        for i, line in enumerate(self.lines):
-            line_num = i + 1
-            line_stripped = line.strip()
-            
-            # Skip empty lines and comments
-            if not line_stripped or line_stripped.startswith('//') or line_stripped.startswith('#'):
-                continue
-            
-            # Function definition
-            if re.search(r'\b(int|char|double|float|long|short|void)\s+main\s*\(', line):
-                control_structures.append(('FUNCTION', line_num, None))
-                if '{' in line:
-                    brace_stack.append(('FUNCTION', line_num))
-            
-            # Control flow statements
-            elif re.search(r'\b(if|for|while)\s*\(', line):
-                if 'if' in line:
-                    control_structures.append(('IF', line_num, None))
-                elif 'for' in line:
-                    control_structures.append(('FOR', line_num, None))
-                elif 'while' in line:
-                    control_structures.append(('WHILE', line_num, None))
-                
-                if '{' in line:
-                    ctrl_type = 'IF' if 'if' in line else ('FOR' if 'for' in line else 'WHILE')
-                    brace_stack.append((ctrl_type, line_num))
-            
-            # else statement
-            elif re.search(r'\belse\b', line):
-                control_structures.append(('ELSE', line_num, None))
-                if '{' in line:
-                    brace_stack.append(('ELSE', line_num))
-            
-            # Track opening braces
-            elif '{' in line and not any(keyword in line for keyword in ['if', 'for', 'while', 'else']):
-                if brace_stack:
-                    brace_stack.append(('BLOCK', line_num))
-            
-            # Track closing braces
-            if '}' in line:
-                if brace_stack:
-                    ctrl_type, start_line = brace_stack.pop()
-                    # Update end lines for control structures
-                    for j in range(len(control_structures) - 1, -1, -1):
-                        if control_structures[j][1] == start_line and control_structures[j][2] is None:
-                            control_structures[j] = (control_structures[j][0], control_structures[j][1], line_num)
-                            break
+        # Which lines contain an opening / closing brace, probed by index below
+        has_open = bytearray('{' in line for line in stripped)
+        has_close = bytearray('}' in line for line in stripped)
+        
+        # Lines that are neither blank nor a // comment, tested once per line
+        is_code = bytearray(bool(line) and not line.startswith('//') for line in stripped)
+        
+        # closing_after[k] = number of lines from k to the end that contain '}'
+        # next_code[k] = first line after k that is neither blank nor a // comment (len(lines) if none)
+        closing_after = [0] * (len(self.lines) + 1)
+        next_code = [0] * len(self.lines)
+        following = len(self.lines)
+        for k in range(len(self.lines) - 1, -1, -1):
+            closing_after[k] = closing_after[k + 1] + has_close[k]
+            next_code[k] = following
+            if is_code[k]:
+                following = k
         
-        # Second pass: create blocks based on identified structures
+        # Create blocks based on the control flow structure
         i = 0
         while i < len(self.lines):
             line = self.lines[i]
             line_num = i + 1
-            line_stripped = line.strip()
+            line_stripped = stripped[i]
             
             # Skip empty lines and preprocessor directives  
             if not line_stripped or line_stripped.startswith('#'):
                 i += 1
                 continue
             
+            # Each of the four patterns below needs one of these words - plain statements
+            # are ruled out with a single scan
+            has_keyword = _BLOCK_KEYWORD_RE.search(line) is not None
+            
             # Function definition - START block
-            if re.search(r'\b(int|char|double|float|long|short|void)\s+main\s*\(', line):
+            if has_keyword and _MAIN_DEF_RE.search(line):
                 self._create_block(block_id, line_num, line_num, [line], "START")
                 block_id += 1
                 i += 1
                 continue
             
             # Loop statements - LOOP block
-            if re.search(r'\b(for|while)\s*\(', line):
+            if has_keyword and _LOOP_RE.search(line):
                 self._create_block(block_id, line_num, line_num, [line], "LOOP")
                 block_id += 1
                 i += 1
                 continue
             
             # If statements - XOR block
-            if re.search(r'\bif\s*\(', line):
+            if has_keyword and _IF_RE.search(line):
                 self._create_block(block_id, line_num, line_num, [line], "XOR")
                 block_id += 1
                 i += 1
@@ -2039,25 +2781,16 @@ class TTAGraphAnalyzer:
                 end_line = line_num
                 block_lines = [line]
                 
-                # Look ahead for closing brace
-                j = i + 1
-                while j < len(self.lines):
-                    next_line = self.lines[j]
-                    next_line_stripped = next_line.strip()
-                    
-                    if next_line_stripped == '}':
-                        # This is likely the closing brace of main function
-                        # Check if this is the last closing brace
-                        remaining_braces = sum(1 for k in range(j + 1, len(self.lines)) if '}' in self.lines[k])
-                        if remaining_braces == 0:  # This is the last closing brace
-                            block_lines.append(next_line)
-                            end_line = j + 1
-                            i = j  # Skip the closing brace line
-                        break
-                    elif next_line_stripped and not next_line_stripped.startswith('//'):
-                        # Found non-empty, non-comment line that's not a closing brace
-                        break
-                    j += 1
+                # Look ahead for closing brace, past blank and comment lines
+                j = next_code[i]
+                if j < len(self.lines) and stripped[j] == '}':
+                    # This is likely the closing brace of main function
+                    # Check if this is the last closing brace
+                    remaining_braces = closing_after[j + 1]
+                    if remaining_braces == 0:  # This is the last closing brace
+                        block_lines.append(self.lines[j])
+                        end_line = j + 1
+                        i = j  # Skip the closing brace line
                 
                 self._create_block(block_id, line_num, end_line, block_lines, "END")
                 block_id += 1
@@ -2065,14 +2798,14 @@ class TTAGraphAnalyzer:
                 continue
             
             # else statements - start new block
-            if re.search(r'\belse\b', line):
+            if has_keyword and _ELSE_RE.search(line):
                 # else is usually part of the next activity block
                 # Find the extent of this else block
                 start_line = line_num
                 block_lines = []
                 
                 # If else has opening brace on same line
-                if '{' in line:
+                if has_open[i]:
                     block_lines.append(line)
                     i += 1
                     brace_count = 1
@@ -2104,43 +2837,43 @@ class TTAGraphAnalyzer:
                 continue
             
             # Opening brace after control structure - start collecting block content
-            if '{' in line and i > 0:
-                prev_line = self.lines[i - 1].strip()
-                if any(keyword in prev_line for keyword in ['if', 'for', 'while', 'else']):
+            if has_open[i] and i > 0:
+                prev_line = stripped[i - 1]
+                if _BRACE_OWNER_RE.search(prev_line):
                     # This opening brace belongs to previous control structure
                     # Start collecting sequential statements
                     start_line = line_num
                     block_lines = []
+                    has_statement = False
                     i += 1
                     
                     # Collect sequential statements until we hit another control structure or closing brace
                     while i < len(self.lines):
                         current_line = self.lines[i]
-                        current_stripped = current_line.strip()
+                        current_stripped = stripped[i]
                         
                         # Stop conditions
-                        if (re.search(r'\b(if|for|while|else|return)\b', current_stripped) or
-                            '}' in current_stripped):
+                        if (_CONTROL_KEYWORD_RE.search(current_stripped) or
+                            has_close[i]):
                             break
                         
                         # Add line to current block
-                        if current_stripped or current_stripped.startswith('//'):  # Include comments
+                        if current_stripped:  # Include comments
                             block_lines.append(current_line)
+                            if is_code[i]:
+                                has_statement = True
                         
                         i += 1
                     
-                    # Create activity block if we collected statements
-                    if block_lines:
-                        # Filter out empty blocks
-                        meaningful_lines = [l for l in block_lines if l.strip() and not l.strip().startswith('//')]
-                        if meaningful_lines:
-                            self._create_block(block_id, start_line, start_line + len(block_lines) - 1, 
-                                             block_lines, "ACTIVITY")
-                            block_id += 1
+                    # Create activity block if we collected statements (not just comments)
+                    if has_statement:
+                        self._create_block(block_id, start_line, start_line + len(block_lines) - 1,
+                                         block_lines, "ACTIVITY")
+                        block_id += 1
                     continue
             
             # Regular statements - collect sequential statements into activity blocks
-            if line_stripped and not line_stripped.startswith('//'):
+            if is_code[i]:
                 start_line = line_num
                 block_lines = [line]
                 i += 1
@@ -2148,33 +2881,31 @@ class TTAGraphAnalyzer:
                 # Collect sequential statements
                 while i < len(self.lines):
                     current_line = self.lines[i]
-                    current_stripped = current_line.strip()
+                    current_stripped = stripped[i]
                     
                     # Stop conditions for block boundary
                     if (not current_stripped or  # Empty line
                         current_stripped.startswith('#') or  # Preprocessor
-                        re.search(r'\b(if|for|while|else|return)\b', current_stripped) or  # Control flow
+                        _CONTROL_KEYWORD_RE.search(current_stripped) or  # Control flow
                         current_stripped == '}' or  # Closing brace alone
-                        ('}' in current_stripped and '{' not in current_stripped)):  # Line with closing brace
+                        (has_close[i] and not has_open[i])):  # Line with closing brace
                         break
                     
                     # Add line to current block
                     block_lines.append(current_line)
                     i += 1
                 
-                # Create activity block if meaningful
-                meaningful_lines = [l for l in block_lines if l.strip() and not l.strip().startswith('//')]
-                if meaningful_lines:
-                    self._create_block(block_id, start_line, start_line + len(block_lines) - 1, 
-                                     block_lines, "ACTIVITY")
-                    block_id += 1
+                # Create activity block - the first line is always a statement
+                self._create_block(block_id, start_line, start_line + len(block_lines) - 1,
+                                 block_lines, "ACTIVITY")
+                block_id += 1
             else:
                 i += 1
     
     def _create_block(self, block_id, start_line, end_line, lines, block_type):
         """Create a block with the given parameters"""
         # Filter meaningful lines for preview
-        meaningful_lines = [l.strip() for l in lines if l.strip() and not l.strip().startswith('//')]
+        meaningful_lines = [l for l in map(str.strip, lines) if l and not l.startswith('//')]
         
         # Create code preview
         if meaningful_lines:
@@ -2195,15 +2926,19 @@ class TTAGraphAnalyzer:
         }
         
         self.blocks.append(block)
+        self.node_types.append(block_type)
+        self.block_closes.append(any('}' in line for line in lines))
+        self.block_has_else.append(any('else' in line for line in lines))
     
     def create_control_flow_arcs(self):
         """Create arcs based on logical control flow"""
         self.arcs = []
+        node_types = self.node_types
         
-        for i, block in enumerate(self.blocks):
+        for i, node_type in enumerate(node_types):
             # START blocks always flow to next block
-            if block['node_type'] == 'START':
-                if i + 1 < len(self.blocks):
+            if node_type == 'START':
+                if i + 1 < len(node_types):
                     self.arcs.append({
                         'from': i,
                         'to': i + 1,
@@ -2212,7 +2947,7 @@ class TTAGraphAnalyzer:
                     })
             
             # ACTIVITY blocks have sequential flow unless they're branches
-            elif block['node_type'] == 'ACTIVITY':
+            elif node_type == 'ACTIVITY':
                 # Check if this is inside a conditional branch
                 if self._is_branch_block(i):
                     # Find where branches merge
@@ -2226,7 +2961,7 @@ class TTAGraphAnalyzer:
                         })
                 else:
                     # Regular sequential flow
-                    if i + 1 < len(self.blocks) and self.blocks[i + 1]['node_type'] != 'END':
+                    if i + 1 < len(node_types) and node_types[i + 1] != 'END':
                         self.arcs.append({
                             'from': i,
                             'to': i + 1,
@@ -2235,9 +2970,9 @@ class TTAGraphAnalyzer:
                         })
             
             # LOOP blocks
-            elif block['node_type'] == 'LOOP':
+            elif node_type == 'LOOP':
                 # Loop body entry
-                if i + 1 < len(self.blocks):
+                if i + 1 < len(node_types):
                     self.arcs.append({
                         'from': i,
                         'to': i + 1,
@@ -2266,7 +3001,7 @@ class TTAGraphAnalyzer:
                     })
             
             # XOR blocks (if statements)
-            elif block['node_type'] == 'XOR':
+            elif node_type == 'XOR':
                 branches = self._find_xor_branches(i)
                 
                 if len(branches) >= 1:
@@ -2287,30 +3022,49 @@ class TTAGraphAnalyzer:
     
     def _is_branch_block(self, block_idx):
         """Check if this block is part of a conditional branch"""
+        cached = self._branch_cache.get(block_idx)
+        if cached is not None:
+            return cached
+        
         # Look backwards for XOR block
+        node_types = self.node_types
+        result = False
         for i in range(block_idx - 1, max(0, block_idx - 3), -1):
-            if self.blocks[i]['node_type'] == 'XOR':
-                return True
-        return False
+            if node_types[i] == 'XOR':
+                result = True
+                break
+        self._branch_cache[block_idx] = result
+        return result
     
     def _find_merge_point(self, branch_idx):
         """Find where conditional branches merge"""
+        if branch_idx in self._merge_cache:
+            return self._merge_cache[branch_idx]
+        
         # Simple heuristic: find next non-branch activity or control structure
-        current_block = self.blocks[branch_idx]
+        merge_point = None
         
         # Look for the next block that's after the if-else structure
-        for i in range(branch_idx + 1, len(self.blocks)):
-            block = self.blocks[i]
+        node_types = self.node_types
+        for i in range(branch_idx + 1, len(node_types)):
+            node_type = node_types[i]
             # Merge at next control structure or activity that's not a branch
-            if block['node_type'] in ['LOOP', 'XOR', 'END']:
-                return i
-            elif block['node_type'] == 'ACTIVITY' and not self._is_branch_block(i):
-                return i
+            if node_type in ['LOOP', 'XOR', 'END']:
+                merge_point = i
+                break
+            elif node_type == 'ACTIVITY' and not self._is_branch_block(i):
+                merge_point = i
+                break
         
-        return None
+        self._merge_cache[branch_idx] = merge_point
+        return merge_point
     
     def _find_xor_branches(self, xor_idx):
         """Find the true and false branches of an XOR (if) block"""
+        cached = self._xor_cache.get(xor_idx)
+        if cached is not None:
+            return cached
+        
         branches = []
         
         # Next block is typically the true branch
@@ -2322,39 +3076,46 @@ class TTAGraphAnalyzer:
         true_branch_end = xor_idx + 1
         
         # Find end of true branch
-        if true_branch_end < len(self.blocks):
-            block = self.blocks[true_branch_end]
-            if block['node_type'] == 'ACTIVITY':
+        node_types = self.node_types
+        if true_branch_end < len(node_types):
+            if node_types[true_branch_end] == 'ACTIVITY':
                 # The false branch should be after this activity
-                if true_branch_end + 1 < len(self.blocks):
-                    next_block = self.blocks[true_branch_end + 1]
+                if true_branch_end + 1 < len(node_types):
                     # Check if it's an else block
-                    if next_block['node_type'] == 'ACTIVITY':
+                    if node_types[true_branch_end + 1] == 'ACTIVITY':
                         # Check if any line contains 'else'
-                        has_else = any('else' in line for line in next_block['lines'])
+                        has_else = self.block_has_else[true_branch_end + 1]
                         if has_else or true_branch_end + 1 == xor_idx + 2:  # Immediate next
                             branches.append(true_branch_end + 1)
         
+        self._xor_cache[xor_idx] = branches
         return branches
     
     def _find_loop_exit(self, loop_idx):
         """Find where to go when loop condition is false"""
+        if loop_idx not in self._loop_exit_cache:
+            self._loop_exit_cache[loop_idx] = self._scan_loop_exit(loop_idx)
+        return self._loop_exit_cache[loop_idx]
+    
+    def _scan_loop_exit(self, loop_idx):
+        """Walk the blocks after a loop header to find its exit"""
         # Find the block after all loop body blocks
         loop_depth = 0
+        node_types = self.node_types
         
-        for i in range(loop_idx + 1, len(self.blocks)):
-            block = self.blocks[i]
+        for i in range(loop_idx + 1, len(node_types)):
+            node_type = node_types[i]
             
             # Another loop increases depth
-            if block['node_type'] == 'LOOP':
+            if node_type == 'LOOP':
                 loop_depth += 1
             
             # If we're at depth 0 and find a non-loop-body block
             if loop_depth == 0:
                 # Check if this could be outside the loop
-                if block['node_type'] in ['XOR', 'LOOP', 'END']:
+                if node_type in ['XOR', 'LOOP', 'END']:
                     return i
-                elif block['node_type'] == 'ACTIVITY':
+                elif node_type == 'ACTIVITY':
                     # Check if this activity is after the loop body
                     # Simple heuristic: if it's more than 2 blocks away, it's probably outside
                     if i > loop_idx + 2:
@@ -2365,47 +3126,46 @@ class TTAGraphAnalyzer:
                 loop_depth -= 1
         
         # Default to END block
-        for i in range(loop_idx + 1, len(self.blocks)):
-            if self.blocks[i]['node_type'] == 'END':
+        for i in range(loop_idx + 1, len(node_types)):
+            if node_types[i] == 'END':
                 return i
                 
         return None
     
     def _find_loop_body_end(self, loop_idx):
         """Find the last block in the loop body"""
+        if loop_idx in self._loop_end_cache:
+            return self._loop_end_cache[loop_idx]
+        
         # The last activity block before the loop exit
         last_activity = None
         
         loop_exit = self._find_loop_exit(loop_idx)
         
-        for i in range(loop_idx + 1, len(self.blocks)):
+        node_types = self.node_types
+        for i in range(loop_idx + 1, len(node_types)):
             if loop_exit is not None and i >= loop_exit:
                 break
                 
-            block = self.blocks[i]
-            if block['node_type'] == 'ACTIVITY':
+            node_type = node_types[i]
+            if node_type == 'ACTIVITY':
                 last_activity = i
-            elif block['node_type'] in ['XOR']:
+            elif node_type in ['XOR']:
                 # XOR blocks inside loop - the last branch is the end
                 branches = self._find_xor_branches(i)
                 if branches:
                     last_activity = max(branches)
         
+        self._loop_end_cache[loop_idx] = last_activity
         return last_activity
     
     def _is_loop_end(self, block_idx):
         """Check if this block marks the end of a loop body"""
         if block_idx >= len(self.blocks):
             return False
-            
-        block = self.blocks[block_idx]
         
         # Check if there's a closing brace that ends a loop
-        for line in block['lines']:
-            if '}' in line:
-                return True
-                
-        return False
+        return bool(self.block_closes[block_idx])
     
     def assign_operation_sequences(self):
         """Assign dataflow operation sequences to each block"""
@@ -2413,20 +3173,26 @@ class TTAGraphAnalyzer:
             return
         
         operations = self.dataflow_analyzer.build_operation_sequence()
+        op_lines = [op['line_number'] for op in operations]  # ascending - operations follow line order
         
         for block in self.blocks:
-            block_ops = []
-            
-            # Find operations within this block's line range
-            for op in operations:
-                if block['start_line'] <= op['line_number'] <= block['end_line']:
-                    block_ops.append(op)
-            
-            block['operation_sequence'] = block_ops
+            # Slice out the operations within this block's line range
+            first = bisect_left(op_lines, block['start_line'])
+            last = bisect_right(op_lines, block['end_line'])
+            block['operation_sequence'] = operations[first:last]
     
     def export_tta_graph_format(self):
         """Export TTA graph analysis in JSON format"""
-        tta_graph = {
+        tta_graph = self._tta_graph_header()
+        tta_graph["blocks"] = self.blocks
+        tta_graph["arcs"] = self.arcs
+        tta_graph["c_style_representation"] = self.generate_tta_c_style_output()
+        
+        return tta_graph
+    
+    def _tta_graph_header(self):
+        """Return the metadata and type definitions that open a TTA graph export"""
+        return {
             "metadata": {
                 "structure_type": "TTA_GRAPH",
                 "timestamp": datetime.datetime.now().isoformat(),
@@ -2445,19 +3211,59 @@ class TTAGraphAnalyzer:
                     "dashed_arc": "ttagraph_node*",
                     "dotted_arc": "ttagraph_node*"
                 }
-            },
-            "blocks": self.blocks,
-            "arcs": self.arcs,
-            "c_style_representation": self.generate_tta_c_style_output()
+            }
         }
-        
-        return tta_graph
+    
+    def write_tta_graph_json(self, filename, compact=False, compress=False):
+        """Stream the TTA graph export to filename, single-line if compact, gzipped if compress
+        
+        Writes the same document as export_tta_graph_format, but blocks and arcs are
+        serialized one at a time and the C-style text line by line, so neither the
+        whole document nor the C text is ever built in memory.
+        """
+        indent = None if compact else 2
+        newline = b'' if compact else b'\n'
+        key_separator = b':' if compact else b': '
+        
+        def pad(depth):
+            return b'' if compact else b'  ' * depth
+        
+        def value(data, depth):
+            # Nested values are dumped on their own, then shifted to their depth
+            payload = dumps_json(data, indent)
+            return payload if compact else payload.replace(b'\n', b'\n' + pad(depth))
+        
+        def key(name):
+            return pad(1) + dumps_json(name, None) + key_separator
+        
+        if compress:
+            f = gzip.open(filename, 'wb', compresslevel=1)
+        else:
+            f = open(filename, 'wb', buffering=1 << 20)
+        with f:
+            f.write(b'{' + newline)
+            for name, data in self._tta_graph_header().items():
+                f.write(key(name) + value(data, 1) + b',' + newline)
+            
+            for name, items in (("blocks", self.blocks), ("arcs", self.arcs)):
+                f.write(key(name) + b'[')
+                for j, item in enumerate(items):
+                    f.write((b',' if j else b'') + newline + pad(2) + value(item, 2))
+                f.write((newline + pad(1) if items else b'') + b'],' + newline)
+            
+            # One JSON string, written piece by piece with the line breaks escaped
+            f.write(key("c_style_representation") + b'"')
+            for j, part in enumerate(self.iter_tta_c_style_parts()):
+                f.write((b'\\n' if j else b'') + dumps_json(part, None)[1:-1])
+            f.write(b'"' + newline + b'}')
     
     def generate_tta_c_style_output(self):
         """Generate C-style representation of the TTA graph"""
-        c_lines = []
-        
-        c_lines.extend([
+        return "\n".join(self.iter_tta_c_style_parts())
+    
+    def iter_tta_c_style_parts(self):
+        """Yield the C-style representation of the TTA graph in newline-separated parts"""
+        yield from [
             "// TTA Graph C Structure Definitions",
             "typedef enum {",
             "    ACTIVITY, XOR, LOOP, AND, BLOCK, START, END",
@@ -2485,82 +3291,70 @@ class TTAGraphAnalyzer:
             "};",
             "",
             "// TTA Graph Nodes",
-        ])
+        ]
         
         # Add each block as a C node
         for i, block in enumerate(self.blocks):
-            c_lines.extend([
-                f"// Block {i} - {block['node_type']} (Lines {block['start_line']}-{block['end_line']})",
-                f"// Code: {block['code_preview']}",
-                f"// ttagraph_node block_{i} = {{",
-                f"//     .node_type = {block['node_type']},",
-                f"//     .operation_sequence = /* {len(block['operation_sequence'])} operations */,",
-                f"//     .solid_arc = /* determined by arcs */,",
-                f"//     .dashed_arc = /* determined by arcs */,",
-                f"//     .dotted_arc = /* determined by arcs */",
-                f"// }};",
-                ""
-            ])
-        
-        return "\n".join(c_lines)
-    
-    def save_graph_image(self, filename):
-        """Save TTA graph as image file with improved layout"""
+            node_type = block['node_type']
+            
+            # One string per block (its trailing newline leaves the blank separator line)
+            yield (
+                f"// Block {i} - {node_type} (Lines {block['start_line']}-{block['end_line']})\n"
+                f"// Code: {block['code_preview']}\n"
+                f"// ttagraph_node block_{i} = {{\n"
+                f"//     .node_type = {node_type},\n"
+                f"//     .operation_sequence = /* {len(block['operation_sequence'])} operations */,\n"
+                "//     .solid_arc = /* determined by arcs */,\n"
+                "//     .dashed_arc = /* determined by arcs */,\n"
+                "//     .dotted_arc = /* determined by arcs */\n"
+                "// };\n"
+            )
+    
+    def save_graph_image(self, filename, fast=False):
+        """Save TTA graph as image file with improved layout (fast: lower resolution and compression)"""
         try:
             # Calculate figure size based on number of blocks
             num_blocks = len(self.blocks)
             fig_height = max(12, num_blocks * 0.8)
             fig_width = max(16, 16 + (num_blocks - 20) * 0.2) if num_blocks > 20 else 16
             
-            # Create figure with dynamic size
-            fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+            # Create figure with dynamic size (standalone, so no pyplot window is involved)
+            fig = Figure(figsize=(fig_width, fig_height))
+            ax = fig.add_subplot(111)
             fig.patch.set_facecolor('white')
             
             if self.blocks:
                 # Create hierarchical layout with better spacing
                 pos = self._create_save_layout()
                 
-                # Draw nodes with better styling
+                # Adaptive node sizing
+                if num_blocks <= 20:
+                    box_width, box_height = 2.4, 1.0
+                    font_size = 10
+                elif num_blocks <= 40:
+                    box_width, box_height = 2.8, 1.2
+                    font_size = 9
+                else:
+                    box_width, box_height = 3.2, 1.4
+                    font_size = 8
+                
+                # Draw nodes with better styling; the boxes are added as one collection
+                boxes = []
                 for i, block in enumerate(self.blocks):
                     x, y = pos[i]
                     
-                    # Adaptive node sizing
-                    if num_blocks <= 20:
-                        box_width, box_height = 2.4, 1.0
-                        font_size = 10
-                    elif num_blocks <= 40:
-                        box_width, box_height = 2.8, 1.2
-                        font_size = 9
-                    else:
-                        box_width, box_height = 3.2, 1.4
-                        font_size = 8
-                    
                     # Color nodes by type
-                    if block['node_type'] == 'START':
-                        color = 'lightgreen'
-                        edge_color = 'darkgreen'
-                    elif block['node_type'] == 'END':
-                        color = 'lightcoral'
-                        edge_color = 'darkred'
-                    elif block['node_type'] == 'XOR':
-                        color = 'lightyellow'
-                        edge_color = 'orange'
-                    elif block['node_type'] == 'LOOP':
-                        color = 'lightblue'
-                        edge_color = 'darkblue'
-                    else:  # ACTIVITY, BLOCK
-                        color = 'lightgray'
-                        edge_color = 'gray'
+                    color, edge_color = TTA_NODE_COLORS.get(block['node_type'], TTA_DEFAULT_NODE_COLORS)
                     
                     # Draw node as rectangle
                     box = FancyBboxPatch((x-box_width/2, y-box_height/2), box_width, box_height,
-                                        boxstyle="round,pad=0.1",
+                                        boxstyle=TTA_BOX_STYLE,
                                         facecolor=color,
                                         edgecolor=edge_color,
                                         linewidth=2,
                                         alpha=0.9,
                                         zorder=2)
-                    ax.add_patch(box)
+                    boxes.append(box)
                     
                     # Add label
                     if num_blocks > 50:
@@ -2570,14 +3364,28 @@ class TTAGraphAnalyzer:
                     ax.text(x, y, label, ha='center', va='center', fontsize=font_size, 
                            fontweight='bold', zorder=3)
                 
+                ax.add_collection(PatchCollection(boxes, match_original=True, zorder=2))
+                
+                # Arrows connect to the box edges, which are the same for every node
+                y_offset = box_height / 2
+                x_offset = box_width / 2
+                
+                # Arrow heads are scaled like those of an annotation with the default font size
+                arrow_scale = matplotlib.rcParams['font.size']
+                
+                # Connection points of all arcs at once: the vertical edges facing each other,
+                # shifted sideways towards the other node for diagonal arrows
+                from_points = pos[[arc['from'] for arc in self.arcs]]
+                to_points = pos[[arc['to'] for arc in self.arcs]]
+                deltas = to_points - from_points
+                shifts = np.column_stack((np.sign(deltas[:, 0]) * (x_offset * 0.8),
+                                          np.where(deltas[:, 1] < 0, -y_offset, y_offset)))
+                from_points += shifts
+                to_points -= shifts
+                
                 # Draw edges with curves
-                for arc in self.arcs:
-                    from_pos = pos[arc['from']]
-                    to_pos = pos[arc['to']]
-                    
-                    dx = to_pos[0] - from_pos[0]
-                    dy = to_pos[1] - from_pos[1]
-                    
+                for arc, (from_x, from_y), (to_x, to_y), dx in zip(self.arcs, from_points.tolist(), to_points.tolist(),
+                                                                   deltas[:, 0].tolist()):
                     # Set edge style - adjust for graph size
                     if arc['arc_type'] == 'solid':
                         color = 'black'
@@ -2595,42 +3403,16 @@ class TTAGraphAnalyzer:
                         linewidth = 3 if num_blocks <= 30 else 2.5
                         connectionstyle = "arc3,rad=-0.5"
                     
-                    # Calculate connection points
-                    if num_blocks <= 20:
-                        y_offset = box_height/2
-                        x_offset = box_width/2
-                    elif num_blocks <= 40:
-                        y_offset = box_height/2
-                        x_offset = box_width/2
-                    else:
-                        y_offset = box_height/2
-                        x_offset = box_width/2
-                    
-                    if dy < 0:
-                        from_y = from_pos[1] - y_offset
-                        to_y = to_pos[1] + y_offset
-                    else:
-                        from_y = from_pos[1] + y_offset
-                        to_y = to_pos[1] - y_offset
-                    
-                    if dx > 0:
-                        from_x = from_pos[0] + x_offset * 0.8
-                        to_x = to_pos[0] - x_offset * 0.8
-                    elif dx < 0:
-                        from_x = from_pos[0] - x_offset * 0.8
-                        to_x = to_pos[0] + x_offset * 0.8
-                    else:
-                        from_x = from_pos[0]
-                        to_x = to_pos[0]
-                    
-                    ax.annotate('', xy=(to_x, to_y), xytext=(from_x, from_y),
-                               arrowprops=dict(arrowstyle='->', 
-                                             color=color, 
-                                             linestyle=linestyle, 
-                                             linewidth=linewidth,
-                                             connectionstyle=connectionstyle,
-                                             shrinkA=5, shrinkB=5),
-                               zorder=1)
+                    # A bare arrow patch - an empty annotation would add a text artist per arc
+                    ax.add_patch(FancyArrowPatch((from_x, from_y), (to_x, to_y),
+                                                 arrowstyle='->',
+                                                 color=color,
+                                                 linestyle=linestyle,
+                                                 linewidth=linewidth,
+                                                 connectionstyle=connectionstyle,
+                                                 shrinkA=5, shrinkB=5,
+                                                 mutation_scale=arrow_scale,
+                                                 zorder=1))
                 
                 # Title removed to prevent cutoff
                 # plt.title("TTA Control Flow Graph", fontsize=18, fontweight='bold', pad=20)
@@ -2650,17 +3432,13 @@ class TTAGraphAnalyzer:
                          borderaxespad=0)
                 
                 # Set axis limits
-                all_x = [p[0] for p in pos.values()]
-                all_y = [p[1] for p in pos.values()]
+                (low_x, low_y), (high_x, high_y) = pos.min(axis=0), pos.max(axis=0)
                 
                 x_padding = 3 if num_blocks > 30 else 2
                 y_padding = 2 if num_blocks > 30 else 1.5
                 
-                ax.set_xlim(min(all_x) - x_padding, max(all_x) + x_padding)
-                ax.set_ylim(min(all_y) - y_padding, max(all_y) + y_padding)
-                
-                grid_alpha = 0.1 if num_blocks > 30 else 0.2
-                ax.grid(True, alpha=grid_alpha, linestyle='--')
+                ax.set_xlim(low_x - x_padding, high_x + x_padding)
+                ax.set_ylim(low_y - y_padding, high_y + y_padding)
             
             # Adjust aspect ratio for very tall graphs
             if num_blocks > 40:
@@ -2668,95 +3446,68 @@ class TTAGraphAnalyzer:
             else:
                 ax.set_aspect('equal')
             ax.axis('off')
-            plt.tight_layout(rect=[0, 0.05, 1, 0.98])  # Adjusted spacing without title
-            plt.savefig(filename, dpi=300, bbox_inches='tight', facecolor='white')
-            plt.close(fig)
+            fig.tight_layout(rect=[0, 0.05, 1, 0.98])  # Adjusted spacing without title
+            fig.savefig(filename, bbox_inches='tight', facecolor='white',
+                        **graph_save_options(filename, fast, (fig_width, fig_height)))
             
-        except Exception as e:
-            raise Exception(f"Could not save TTA graph: {str(e)}")
+        except (OSError, ValueError) as e:
+            raise Exception(f"Could not save TTA graph: {str(e)}") from e
     
     def _create_save_layout(self):
-        """Create layout for saving - similar to display layout"""
-        pos = {}
+        """Create layout for saving - similar to display layout
+        
+        Returns an (n, 2) array holding the x, y position of each block. It is
+        computed once per block structure; callers must not modify it.
+        """
+        if self._save_layout is not None:
+            return self._save_layout
         
         # Calculate dynamic spacing based on number of blocks
         num_blocks = len(self.blocks)
+        pos = np.empty((num_blocks, 2))
         
         # Adaptive spacing parameters
-        if num_blocks <= 15:
-            x_center = 6
-            x_branch_offset = 4
-            y_spacing = 2.5
-        elif num_blocks <= 30:
-            x_center = 8
-            x_branch_offset = 5
-            y_spacing = 3.5
-        else:
-            x_center = 10
-            x_branch_offset = 6
-            y_spacing = 4.5
-            
-        y_level = num_blocks * y_spacing * 1.2
+        x_center, x_branch_offset, y_spacing = tta_layout_spacing(num_blocks)
         
-        positioned = set()
+        y_level = num_blocks * y_spacing * 1.2
+        node_types = np.array(self.node_types)
         
-        for i, block in enumerate(self.blocks):
-            if i in positioned:
+        # XOR blocks place their branches beside them, unless the XOR is itself such a branch
+        by_branch = np.zeros(num_blocks, dtype=bool)
+        branch_idx, branch_owner, branch_x = [], [], []
+        for i in np.flatnonzero(node_types == 'XOR').tolist():
+            if by_branch[i]:
                 continue
-                
-            block_type = block['node_type']
-            
-            if block_type == 'START':
-                pos[i] = (x_center, y_level)
-                y_level -= y_spacing
-                positioned.add(i)
-                
-            elif block_type == 'LOOP':
-                pos[i] = (x_center, y_level)
-                y_level -= y_spacing
-                positioned.add(i)
-                
-            elif block_type == 'XOR':
-                pos[i] = (x_center, y_level)
-                branches = self._find_xor_branches(i)
-                branch_y = y_level - y_spacing
-                
-                if len(branches) >= 1 and branches[0] not in positioned:
-                    pos[branches[0]] = (x_center - x_branch_offset, branch_y)
-                    positioned.add(branches[0])
-                
-                if len(branches) >= 2 and branches[1] not in positioned:
-                    pos[branches[1]] = (x_center + x_branch_offset, branch_y)
-                    positioned.add(branches[1])
-                
-                y_level -= (y_spacing * 2.5 + y_spacing * 0.6)
-                positioned.add(i)
-                
-            elif block_type == 'END':
-                pos[i] = (x_center, y_spacing * 2)
-                positioned.add(i)
-                
-            else:  # ACTIVITY
-                if i not in positioned:
-                    pos[i] = (x_center, y_level)
-                    y_level -= y_spacing
-                    positioned.add(i)
-        
+            for side, branch in zip((-x_branch_offset, x_branch_offset), self._find_xor_branches(i)):
+                if not by_branch[branch]:
+                    by_branch[branch] = True
+                    branch_idx.append(branch)
+                    branch_owner.append(i)
+                    branch_x.append(x_center + side)
+        
+        # All other blocks go down the center, each one step below the previous;
+        # XOR blocks leave room for their branches and END sits at the bottom
+        step = np.where(node_types == 'XOR', y_spacing * 2.5 + y_spacing * 0.6, y_spacing)
+        step[by_branch | (node_types == 'END')] = 0
+        levels = y_level - (np.cumsum(step) - step)
+        
+        pos[:, 0] = x_center
+        pos[:, 1] = levels
+        pos[node_types == 'END', 1] = y_spacing * 2
+        pos[branch_idx, 0] = branch_x
+        pos[branch_idx, 1] = levels[branch_owner] - y_spacing
+        
+        self._save_layout = pos
         return pos
 
 if __name__ == "__main__":
     try:
         # Set matplotlib to non-interactive mode to prevent thread issues
-        plt.ioff()
+        # (all figures are standalone Figure objects, so pyplot is never imported)
+        matplotlib.interactive(False)
         
         c_sde = CSyntaxDirectedEnvironment()
         c_sde.run()
-    except ImportError as e:
-        if "networkx" in str(e) or "matplotlib" in str(e):
-            print("Missing required libraries. Please install:")
-            print("pip install networkx matplotlib")
-        else:
-            print(f"Import error: {e}")
     except KeyboardInterrupt:
         print("\nApplication interrupted by user")
         sys.exit(0)